@@ -0,0 +1,31 @@
+"""
+Cheap wall-clock timestamps for hot logging paths.
+
+Request logging stamps every response. Building a timezone-aware datetime
+and formatting it each time is wasted work when many requests land in the
+same millisecond, so the formatted value is reused within a millisecond.
+"""
+
+import time
+
+# (epoch milliseconds, ISO 8601 text) of the last formatted timestamp
+_cached: tuple[int, str] = (-1, "")
+
+
+def now_iso() -> str:
+    """
+    Current UTC time as ISO 8601 with millisecond precision.
+
+    Returns:
+        e.g. "2024-01-31T12:00:00.123+00:00"
+    """
+    global _cached
+    millis = time.time_ns() // 1_000_000
+    cached = _cached
+    if cached[0] == millis:
+        return cached[1]
+
+    seconds, fraction = divmod(millis, 1000)
+    text = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{fraction:03d}+00:00"
+    _cached = (millis, text)
+    return text
@@ -8,6 +8,7 @@ SECURITY ARCHITECTURE:
 - Security headers protect against common web vulnerabilities
 """
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from typing import Annotated, Any
@@ -22,7 +23,8 @@ from atlas.api.routes.audit import router as audit_router
 from atlas.api.routes.auth import router as auth_router
 from atlas.api.security.audit import AuditEventType, get_audit_logger
 from atlas.api.security.auth import TokenPayload, get_current_user_optional
-from atlas.api.security.middleware import setup_security_middleware
+from atlas.api.security.middleware import get_client_ip, setup_security_middleware
+from atlas.api.security.models import clean_question
 from atlas.connectors.oracle.connector import OracleConnector
 from atlas.connectors.oracle.indexer import OracleSchemaIndexer
 
@@ -50,14 +52,7 @@ class ChatRequest(BaseModel):
     @classmethod
     def sanitize_question(cls, v: str) -> str:
         """Sanitize the question to prevent potential injection."""
-        # Remove null bytes
-        v = v.replace("\x00", "")
-        # Remove excessive whitespace
-        v = " ".join(v.split())
-        # Basic length check after sanitization
-        if len(v) < 3:
-            raise ValueError("Question must be at least 3 characters after cleanup")
-        return v
+        return clean_question(v)
 
 
 class ChatResponse(BaseModel):
@@ -82,7 +77,9 @@ def _create_mock_connector() -> OracleConnector:
     real_connector = OracleConnector.__new__(OracleConnector)
     connector.validate_query = real_connector.validate_query
 
-    async def mock_execute(sql: str, params: dict | None = None) -> list[dict[str, Any]]:
+    async def mock_execute(
+        sql: str, params: dict | None = None, arraysize: int | None = None
+    ) -> list[dict[str, Any]]:
         connector.validate_query(sql)
         if "CUSTOMERS" in sql.upper():
             return [
@@ -186,11 +183,18 @@ async def lifespan(app: FastAPI):
 
     _agent = OracleSQLAgent(connector=connector, indexer=indexer, llm=llm)
 
+    # Archive closed audit days, then buffer writes off the request path
+    audit = get_audit_logger()
+    await asyncio.to_thread(audit.compress_rotated_logs)
+    await audit.start()
+
     print(f"Atlas API initialized (Unsloth: {USE_UNSLOTH})")
 
     yield
 
     # Cleanup
+    await audit.stop()
+    indexer.close()
     _agent = None
 
 
@@ -287,9 +291,7 @@ async def chat(
         raise HTTPException(status_code=503, detail="Agent not initialized")
 
     audit = get_audit_logger()
-    client_ip = http_request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
-    if not client_ip and http_request.client:
-        client_ip = http_request.client.host
+    client_ip = get_client_ip(http_request)
 
     try:
         response = await _agent.run(request.question)
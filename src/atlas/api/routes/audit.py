@@ -7,7 +7,8 @@ SECURITY: Audit logs are read-only and only accessible to admins.
 - Sensitive data is redacted in responses
 """
 
-from datetime import datetime
+import base64
+from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
@@ -27,10 +28,11 @@ class AuditLogResponse(BaseModel):
     """Response for audit log queries."""
 
     events: list[AuditEvent]
-    total: int
+    total: int | None = None
     page: int
     page_size: int
     has_more: bool
+    next_cursor: str | None = None
 
 
 class AuditStatsResponse(BaseModel):
@@ -40,6 +42,35 @@ class AuditStatsResponse(BaseModel):
     events_by_type: dict[str, int]
     events_last_24h: int
     failed_logins_last_24h: int
+    unique_users_today: int
+    unique_ips_today: int
+
+
+def _encode_cursor(event: AuditEvent) -> str:
+    """Build an opaque keyset cursor from the last event of a page."""
+    raw = f"{event.timestamp.isoformat()}|{event.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Decode a keyset cursor into its (timestamp, event_id) pair.
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        ts, event_id = raw.split("|", 1)
+        timestamp = datetime.fromisoformat(ts)
+        if timestamp.tzinfo is None:
+            raise ValueError("cursor timestamp must be timezone-aware")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+    return timestamp, event_id
 
 
 @router.get("/logs", response_model=AuditLogResponse)
@@ -49,12 +80,25 @@ async def get_audit_logs(
     end_date: datetime | None = Query(None, description="Filter events before this date"),
     event_type: AuditEventType | None = Query(None, description="Filter by event type"),
     user_id: str | None = Query(None, description="Filter by user ID"),
-    page: int = Query(1, ge=1, le=10000, description="Page number"),
+    cursor: str | None = Query(None, description="Cursor from a previous page's next_cursor"),
+    page: int = Query(
+        1,
+        ge=1,
+        le=10000,
+        description="Page number (deprecated, use cursor)",
+        deprecated=True,
+    ),
     page_size: int = Query(50, ge=1, le=100, description="Items per page"),
+    include_total: bool = Query(False, description="Also count all matching events"),
 ) -> AuditLogResponse:
     """
     Query audit logs with filters.
 
+    Pagination is keyset-based: pass the returned ``next_cursor`` to fetch
+    the following page. ``page`` is kept for older clients only.
+    ``total`` is only computed when ``include_total`` is set, since it
+    requires a full scan of the logs.
+
     SECURITY:
     - Only admins can query all logs
     - Non-admins can only see their own events
@@ -66,6 +110,12 @@ async def get_audit_logs(
     if user.role != UserRole.ADMIN:
         user_id = user.sub
 
+    # Stored timestamps are UTC-aware; read naive query dates as UTC
+    if start_date and start_date.tzinfo is None:
+        start_date = start_date.replace(tzinfo=timezone.utc)
+    if end_date and end_date.tzinfo is None:
+        end_date = end_date.replace(tzinfo=timezone.utc)
+
     # Validate date range
     if start_date and end_date and start_date > end_date:
         raise HTTPException(
@@ -73,8 +123,11 @@ async def get_audit_logs(
             detail="start_date must be before end_date",
         )
 
+    # Keyset pagination; fall back to offset for legacy page numbers
+    cursor_ts, cursor_id = _decode_cursor(cursor) if cursor else (None, None)
+    offset = 0 if cursor else (page - 1) * page_size
+
     # Query logs
-    offset = (page - 1) * page_size
     events = audit.query(
         start_date=start_date,
         end_date=end_date,
@@ -82,12 +135,24 @@ async def get_audit_logs(
         user_id=user_id,
         limit=page_size + 1,  # Fetch one extra to check if there's more
         offset=offset,
+        cursor_ts=cursor_ts,
+        cursor_id=cursor_id,
     )
 
     # Check if there are more results
     has_more = len(events) > page_size
     if has_more:
         events = events[:page_size]
+    next_cursor = _encode_cursor(events[-1]) if has_more else None
+
+    total = None
+    if include_total:
+        total = audit.count(
+            start_date=start_date,
+            end_date=end_date,
+            event_type=event_type,
+            user_id=user_id,
+        )
 
     # Log this query (audit the auditor)
     audit.log(
@@ -107,10 +172,11 @@ async def get_audit_logs(
 
     return AuditLogResponse(
         events=events,
-        total=len(events),
+        total=total,
         page=page,
         page_size=page_size,
         has_more=has_more,
+        next_cursor=next_cursor,
     )
 
 
@@ -124,38 +190,19 @@ async def get_audit_stats(
 
     SECURITY: Only admins can view aggregate statistics.
     """
-    from datetime import timedelta, timezone
-
     audit = get_audit_logger()
 
-    # Get all events (limited)
-    all_events = audit.query(limit=10000)
-
-    # Count by type
-    events_by_type: dict[str, int] = {}
-    for event in all_events:
-        event_type = event.event_type.value
-        events_by_type[event_type] = events_by_type.get(event_type, 0) + 1
-
-    # Events in last 24 hours
-    now = datetime.now(timezone.utc)
-    yesterday = now - timedelta(hours=24)
-
-    events_last_24h = sum(
-        1 for e in all_events if e.timestamp >= yesterday
-    )
-
-    # Failed logins in last 24 hours
-    failed_logins_last_24h = sum(
-        1 for e in all_events
-        if e.timestamp >= yesterday and e.event_type == AuditEventType.LOGIN_FAILURE
-    )
+    # Served from the hourly rollups; no per-event scan
+    yesterday = datetime.now(timezone.utc) - timedelta(hours=24)
+    stats = audit.stats(since=yesterday)
 
     return AuditStatsResponse(
-        total_events=len(all_events),
-        events_by_type=events_by_type,
-        events_last_24h=events_last_24h,
-        failed_logins_last_24h=failed_logins_last_24h,
+        total_events=stats.total_events,
+        events_by_type=stats.events_by_type,
+        events_last_24h=stats.events_since,
+        failed_logins_last_24h=stats.failed_logins_since,
+        unique_users_today=stats.unique_users_today,
+        unique_ips_today=stats.unique_ips_today,
     )
 
 
@@ -173,20 +220,21 @@ async def get_audit_event(
     """
     audit = get_audit_logger()
 
-    # Query for the specific event
-    events = audit.query(limit=10000)
-
-    for event in events:
-        if event.id == event_id:
-            # Check permissions
-            if user.role != UserRole.ADMIN and event.user_id != user.sub:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="You can only view your own audit events",
-                )
-            return event
-
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Audit event not found: {event_id}",
+    def check_owner(owner: str | None) -> None:
+        # Runs on the raw row, so others' events are never fully parsed
+        if owner != user.sub:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only view your own audit events",
+            )
+
+    event = audit.get_by_id(
+        event_id, check_owner=None if user.role == UserRole.ADMIN else check_owner
     )
+    if event is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Audit event not found: {event_id}",
+        )
+
+    return event
@@ -18,11 +18,16 @@ from atlas.api.security.audit import AuditEventType, get_audit_logger
 from atlas.api.security.auth import (
     TokenPayload,
     UserRole,
+    _mock_users,
+    _next_user_id,
+    _UserRecord,
     authenticate_user,
     create_access_token,
     get_current_user,
-    get_password_hash,
+    get_password_hash_async,
+    invalidate_cached_token,
 )
+from atlas.api.security.middleware import get_client_ip
 from atlas.api.security.models import (
     AuthRequest,
     AuthResponse,
@@ -56,9 +61,7 @@ async def login(request: Request, auth_request: AuthRequest) -> AuthResponse:
     - Tokens have limited expiration
     """
     audit = get_audit_logger()
-    client_ip = request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
-    if not client_ip and request.client:
-        client_ip = request.client.host
+    client_ip = get_client_ip(request)
 
     # Authenticate user
     user = await authenticate_user(
@@ -116,12 +119,8 @@ async def register(request: Request, register_request: RegisterRequest) -> AuthR
     - Email uniqueness is enforced
     - Input is validated with Pydantic
     """
-    from atlas.api.security.auth import _mock_users
-
     audit = get_audit_logger()
-    client_ip = request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
-    if not client_ip and request.client:
-        client_ip = request.client.host
+    client_ip = get_client_ip(request)
 
     # Check if user already exists
     if register_request.email in _mock_users:
@@ -131,37 +130,30 @@ async def register(request: Request, register_request: RegisterRequest) -> AuthR
         )
 
     # Create new user
-    user_id = f"user_{len(_mock_users) + 1:03d}"
-    password_hash = get_password_hash(register_request.password.get_secret_value())
-
-    user_data = {
-        "id": user_id,
-        "email": register_request.email,
-        "password_hash": password_hash,
-        "full_name": register_request.full_name,
-        "role": UserRole.VIEWER,  # Default role
-        "organization": register_request.organization,
-        "created_at": datetime.now(timezone.utc),
-        "last_login": datetime.now(timezone.utc),
-        "is_active": True,
-        "mfa_enabled": False,
-    }
-
-    _mock_users[register_request.email] = user_data
-
-    # Create user profile
+    password_hash = await get_password_hash_async(register_request.password.get_secret_value())
+    now = datetime.now(timezone.utc)
+
     user = UserProfile(
-        id=user_id,
+        id=_next_user_id(),
         email=register_request.email,
         full_name=register_request.full_name,
-        role=UserRole.VIEWER,
+        role=UserRole.VIEWER,  # Default role
         organization=register_request.organization,
-        created_at=user_data["created_at"],
-        last_login=user_data["last_login"],
+        created_at=now,
+        last_login=now,
         is_active=True,
         mfa_enabled=False,
     )
 
+    # Hashing yielded the event loop, so a concurrent registration may have
+    # claimed the email since the check above; never replace its record
+    record = _UserRecord(profile=user, password_hash=password_hash)
+    if _mock_users.setdefault(register_request.email, record) is not record:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A user with this email already exists",
+        )
+
     # Create access token
     token, expires_at = create_access_token(
         user_id=user.id,
@@ -200,12 +192,12 @@ async def logout(
     - Logs the logout event
     """
     audit = get_audit_logger()
-    client_ip = request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
-    if not client_ip and request.client:
-        client_ip = request.client.host
+    client_ip = get_client_ip(request)
 
     # In production, add token JTI to blocklist
-    # For now, just log the logout
+    # For now, drop any cached verification and log the logout
+    invalidate_cached_token(user.jti)
+
     audit.log(
         event_type=AuditEventType.LOGOUT,
         user_id=user.sub,
@@ -230,28 +222,14 @@ async def get_user(
     - Requires valid authentication token
     - Returns only safe user data (no password hash)
     """
-    from atlas.api.security.auth import _mock_users
-
-    user_data = _mock_users.get(user.email)
-    if not user_data:
+    record = _mock_users.get(user.email)
+    if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
-    return UserResponse(
-        user=UserProfile(
-            id=user_data["id"],
-            email=user_data["email"],
-            full_name=user_data["full_name"],
-            role=user_data["role"],
-            organization=user_data["organization"],
-            created_at=user_data["created_at"],
-            last_login=user_data["last_login"],
-            is_active=user_data["is_active"],
-            mfa_enabled=user_data["mfa_enabled"],
-        )
-    )
+    return UserResponse(user=record.profile)
 
 
 @router.post("/refresh", response_model=AuthResponse)
@@ -267,15 +245,11 @@ async def refresh_token(
     - Issues new token with fresh expiration
     - Logs token refresh for audit
     """
-    from atlas.api.security.auth import _mock_users
-
     audit = get_audit_logger()
-    client_ip = request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
-    if not client_ip and request.client:
-        client_ip = request.client.host
+    client_ip = get_client_ip(request)
 
-    user_data = _mock_users.get(user.email)
-    if not user_data:
+    record = _mock_users.get(user.email)
+    if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
@@ -301,15 +275,5 @@ async def refresh_token(
     return AuthResponse(
         access_token=token,
         expires_at=expires_at,
-        user=UserProfile(
-            id=user_data["id"],
-            email=user_data["email"],
-            full_name=user_data["full_name"],
-            role=user_data["role"],
-            organization=user_data["organization"],
-            created_at=user_data["created_at"],
-            last_login=user_data["last_login"],
-            is_active=user_data["is_active"],
-            mfa_enabled=user_data["mfa_enabled"],
-        ),
+        user=record.profile,
     )
@@ -21,8 +21,10 @@ from atlas.api.security.auth import (
     get_current_user,
     get_current_user_optional,
     get_password_hash,
+    get_password_hash_async,
     require_auth,
     verify_password,
+    verify_password_async,
     verify_token,
 )
 from atlas.api.security.middleware import (
@@ -56,7 +58,9 @@ __all__ = [
     "get_current_user",
     "get_current_user_optional",
     "get_password_hash",
+    "get_password_hash_async",
     "verify_password",
+    "verify_password_async",
     "require_auth",
     # Middleware
     "SecurityMiddleware",
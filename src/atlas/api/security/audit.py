@@ -7,13 +7,32 @@ SECURITY: Comprehensive audit trail for compliance and security monitoring.
 - Supports PDPL compliance requirements
 """
 
+import asyncio
+import gzip
+import hashlib
+import itertools
+import logging
+import math
 import os
-from datetime import datetime, timezone
+import re
+import shutil
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Callable, Iterator
 
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, Field, ValidationError
+
+logger = logging.getLogger(__name__)
+
+# On-disk format: one compact JSON object per line, UTC timestamps with "Z"
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE
 
 
 class AuditEventType(str, Enum):
@@ -65,6 +84,179 @@ class AuditEvent(BaseModel):
     error_message: str | None = None
 
 
+@dataclass
+class AuditStats:
+    """Aggregate audit counters computed from the hourly rollups."""
+
+    total_events: int
+    events_by_type: dict[str, int]
+    events_since: int
+    failed_logins_since: int
+    unique_users_today: int = 0
+    unique_ips_today: int = 0
+
+
+class _HyperLogLog:
+    """
+    Approximate distinct counter (HyperLogLog, 2**11 one-byte registers).
+
+    Uses 2 KB regardless of how many values are added, with a standard
+    error of about 2.3%.
+    """
+
+    PRECISION = 11
+    _REGISTERS = 1 << PRECISION
+    _ALPHA = 0.7213 / (1 + 1.079 / _REGISTERS)
+
+    def __init__(self) -> None:
+        self._registers = bytearray(self._REGISTERS)
+
+    def add(self, value: str) -> None:
+        """Record one value."""
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+        x = int.from_bytes(digest, "big")
+        index = x >> (64 - self.PRECISION)
+        rest = x & ((1 << (64 - self.PRECISION)) - 1)
+        rank = (64 - self.PRECISION) - rest.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def count(self) -> int:
+        """Estimate the number of distinct values added."""
+        m = self._REGISTERS
+        estimate = self._ALPHA * m * m / sum(2.0**-r for r in self._registers)
+        zeros = self._registers.count(0)
+        if zeros and estimate <= 2.5 * m:
+            estimate = m * math.log(m / zeros)  # Small-range correction
+        return round(estimate)
+
+
+@dataclass
+class _FileRollup:
+    """Hourly event counts and distinct sketches for one day's log."""
+
+    offset: int = 0
+    counts: Counter[tuple[str, str]] = field(default_factory=Counter)
+    users: _HyperLogLog = field(default_factory=_HyperLogLog)
+    ips: _HyperLogLog = field(default_factory=_HyperLogLog)
+    sealed: bool = False  # Compressed: nothing more will be appended
+
+
+# Detail keys containing any of these fragments are redacted before logging
+_SENSITIVE_KEYS = frozenset(
+    {
+        "password",
+        "token",
+        "secret",
+        "api_key",
+        "apikey",
+        "authorization",
+        "auth",
+        "credential",
+        "ssn",
+        "credit_card",
+        "card_number",
+    }
+)
+_SENSITIVE_KEY_PATTERN = re.compile(
+    "|".join(re.escape(fragment) for fragment in sorted(_SENSITIVE_KEYS)),
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=1024)
+def _sensitive_keys_in(keys: tuple[str, ...]) -> frozenset[str]:
+    """
+    Return the sensitive keys of a details dict, memoised per key shape.
+
+    Audit calls reuse a handful of detail shapes, so most calls are a
+    single cache hit instead of a regex scan per key.
+    """
+    return frozenset(key for key in keys if _SENSITIVE_KEY_PATTERN.search(key))
+
+
+def gzip_log_file(log_file: Path, compresslevel: int = 9) -> Path:
+    """
+    Replace a closed log file with a gzipped copy next to it.
+
+    The archive is written to a temporary name and renamed into place
+    before the original is removed, so readers always see one of them.
+
+    Returns:
+        Path of the .gz archive
+    """
+    archive = log_file.with_name(log_file.name + ".gz")
+    tmp = archive.with_name(archive.name + ".tmp")
+    with open(log_file, "rb") as src, gzip.open(tmp, "wb", compresslevel=compresslevel) as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, archive)
+    log_file.unlink()
+    return archive
+
+
+def _open_log(log_file: Path) -> BinaryIO:
+    """Open a daily log for binary reading, decompressing archived days."""
+    if log_file.suffix == ".gz":
+        return gzip.open(log_file, "rb")
+    return open(log_file, "rb")
+
+
+def _log_day(moment: datetime) -> str:
+    """Return the UTC day a log file name uses for the given moment."""
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%d")
+
+
+_RowPredicate = Callable[[dict[str, Any]], bool]
+
+
+def _both(first: _RowPredicate, second: _RowPredicate) -> _RowPredicate:
+    """Chain two row predicates into one."""
+    return lambda row: first(row) and second(row)
+
+
+def _compile_predicate(
+    start_date: datetime | None,
+    end_date: datetime | None,
+    event_type: AuditEventType | None,
+    user_id: str | None,
+    cursor: tuple[datetime, str] | None,
+) -> _RowPredicate:
+    """
+    Build a single row predicate for a fixed set of query filters.
+
+    Unset filters cost nothing per row, cheap key compares run before the
+    timestamp is parsed, and the timestamp is only parsed at all when a
+    date bound or cursor is present.
+    """
+    checks: list[_RowPredicate] = []
+
+    if event_type:
+        # Compare against the plain string value, not the str-Enum member
+        event_type_value = event_type.value
+        checks.append(lambda row: row["event_type"] == event_type_value)
+    if user_id:
+        checks.append(lambda row: row.get("user_id") == user_id)
+
+    if cursor or start_date or end_date:
+
+        def in_range(row: dict[str, Any]) -> bool:
+            timestamp = datetime.fromisoformat(row["timestamp"])
+            if cursor and (timestamp, row["id"]) >= cursor:
+                return False
+            if start_date and timestamp < start_date:
+                return False
+            return not (end_date and timestamp > end_date)
+
+        checks.append(in_range)
+
+    if not checks:
+        return lambda row: True
+    predicate = checks[0]
+    for check in checks[1:]:
+        predicate = _both(predicate, check)
+    return predicate
+
+
 class AuditLogger:
     """
     Audit logger for security and compliance.
@@ -76,23 +268,187 @@ class AuditLogger:
 
     In production, this should write to a secure, immutable log store
     (e.g., PostgreSQL with RLS, or a dedicated SIEM system).
+
+    Once start() is awaited (done in the API lifespan), events are buffered
+    and written in batches by a background task. Security-critical events
+    are still written synchronously so they are durable before the request
+    returns.
+
+    A batch that fails to write goes back into the buffer and is retried at
+    the next flush. Events that cannot be kept (unserializable, past
+    MAX_BUFFERED_EVENTS, or pending when stop() fails) are logged and
+    counted in dropped_events.
     """
 
+    # Buffered events are flushed at this size or interval, whichever is first
+    BATCH_SIZE = 100
+    FLUSH_INTERVAL_SECONDS = 0.1
+    # Events held for retry while writes are failing, before the oldest are dropped
+    MAX_BUFFERED_EVENTS = 10_000
+
+    # Events that must hit disk before log() returns
+    SYNC_EVENT_TYPES = frozenset(
+        {
+            AuditEventType.LOGIN_FAILURE,
+            AuditEventType.UNAUTHORIZED_ACCESS,
+        }
+    )
+
     def __init__(self, log_dir: str | None = None):
         self.log_dir = Path(log_dir or os.getenv("ATLAS_AUDIT_LOG_DIR", "./logs/audit"))
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self._event_counter = 0
+        self._id_lock = threading.Lock()
+        self._current_day: tuple[int, int] | None = None
+        self._current_path: Path | None = None
+        self._fh: BinaryIO | None = None
+        self._rollups: dict[str, _FileRollup] = {}
+        self._buffer: list[AuditEvent] | None = None
+        self._buffer_lock = threading.Lock()
+        self._flusher: asyncio.Task | None = None
+        self.dropped_events = 0
+
+    async def start(self) -> None:
+        """Start buffering writes and flushing them from a background task."""
+        if self._flusher is not None:
+            return
+        self._buffer = []
+        self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        """Stop the background task and write any buffered events."""
+        if self._flusher is None:
+            return
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self._flusher = None
+        # Take the last batch and leave buffered mode in one step, so no
+        # concurrent log() can append to a buffer that will never be flushed
+        with self._buffer_lock:
+            batch, self._buffer = self._buffer, None
+            try:
+                if batch:
+                    self._write_events(batch)
+            except OSError:
+                # No buffer left to retry from
+                logger.exception("Audit flush on stop failed; dropped %d events", len(batch))
+                self.dropped_events += len(batch)
+            finally:
+                self._close_handle()
+
+    async def _flush_periodically(self) -> None:
+        """Background task: flush the buffer every FLUSH_INTERVAL_SECONDS."""
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL_SECONDS)
+            try:
+                self.flush()
+            except OSError:
+                # The batch is back in the buffer; keep flushing
+                logger.exception("Audit flush failed; will retry")
+
+    def flush(self) -> None:
+        """
+        Write all buffered events to the log file.
+
+        Raises:
+            OSError: If the write fails; the events stay buffered for retry
+        """
+        with self._buffer_lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            self._write_buffered(batch)
+
+    def _write_buffered(self, batch: list[AuditEvent]) -> None:
+        """
+        Write a batch taken from the buffer, restoring it if the write fails.
+
+        Callers must hold _buffer_lock, with buffering active.
+        """
+        try:
+            self._write_events(batch)
+        except OSError:
+            # Reopen the file on the next attempt; this handle may be broken
+            fh, self._fh = self._fh, None
+            if fh is not None:
+                try:
+                    fh.close()
+                except OSError:
+                    pass
+            self._buffer[:0] = batch
+            overflow = len(self._buffer) - self.MAX_BUFFERED_EVENTS
+            if overflow > 0:
+                logger.error("Audit buffer full; dropped %d oldest events", overflow)
+                del self._buffer[:overflow]
+                self.dropped_events += overflow
+            raise
 
     def _generate_event_id(self) -> str:
-        """Generate a unique event ID."""
-        self._event_counter += 1
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
-        return f"evt_{timestamp}_{self._event_counter:06d}"
+        """
+        Generate a unique, time-sortable event ID.
+
+        Format: evt_<unix time in ns, 20 digits>_<4 hex digit sequence>
+        """
+        ns = time.time_ns()
+        with self._id_lock:
+            self._event_counter = seq = (self._event_counter + 1) & 0xFFFF
+        return f"evt_{ns:020d}_{seq:04x}"
+
+    def close(self) -> None:
+        """Close the open log file handle, if any."""
+        with self._buffer_lock:
+            self._close_handle()
+
+    def _close_handle(self) -> None:
+        """Close the handle without locking (caller holds _buffer_lock)."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
 
     def _get_log_file(self) -> Path:
-        """Get the current log file path (daily rotation)."""
-        date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        return self.log_dir / f"audit_{date_str}.jsonl"
+        """Get the current log file path (daily rotation, cached per UTC day)."""
+        now = time.gmtime()
+        day = (now.tm_year, now.tm_yday)
+        if day != self._current_day or self._current_path is None:
+            self._current_day = day
+            self._current_path = self.log_dir / time.strftime("audit_%Y-%m-%d.jsonl", now)
+            self._close_handle()  # Rotated: next write opens the new day's file
+        return self._current_path
+
+    def _log_files(self) -> list[tuple[str, Path]]:
+        """
+        List daily log files as (day, path), newest day first.
+
+        Archived days are read from their .jsonl.gz file; if a day has both
+        (mid-compression), the uncompressed file wins.
+        """
+        files: dict[str, Path] = {}
+        for pattern in ("audit_*.jsonl.gz", "audit_*.jsonl"):
+            for log_file in self.log_dir.glob(pattern):
+                files[log_file.name.removeprefix("audit_")[:10]] = log_file
+        return sorted(files.items(), reverse=True)
+
+    def compress_rotated_logs(self) -> int:
+        """
+        Gzip every daily log file older than the current UTC day.
+
+        Closed days are never appended to again, and JSONL compresses
+        well, so archiving them cuts the bytes every later scan reads.
+
+        Returns:
+            Number of files compressed
+        """
+        today = time.strftime("%Y-%m-%d", time.gmtime())
+        compressed = 0
+        for day, log_file in self._log_files():
+            if day >= today or log_file.suffix == ".gz":
+                continue
+            gzip_log_file(log_file)
+            compressed += 1
+        return compressed
 
     def log(
         self,
@@ -110,7 +466,10 @@ class AuditLogger:
         """
         Log an audit event.
 
-        SECURITY: All parameters are validated and sanitized.
+        SECURITY: Details are sanitized before they are stored.
+
+        Arguments come from typed call sites inside the API, so the event
+        is built with model_construct() and skips Pydantic validation.
 
         Args:
             event_type: Type of event being logged
@@ -130,8 +489,9 @@ class AuditLogger:
         # Sanitize details to prevent sensitive data leakage
         safe_details = self._sanitize_details(details or {})
 
-        event = AuditEvent(
+        event = AuditEvent.model_construct(
             id=self._generate_event_id(),
+            timestamp=datetime.now(timezone.utc),
             event_type=event_type,
             user_id=user_id,
             user_email=user_email,
@@ -145,7 +505,20 @@ class AuditLogger:
         )
 
         # Write to log file (append-only)
-        self._write_event(event)
+        with self._buffer_lock:
+            if self._buffer is None:
+                self._write_events([event])
+            elif event_type in self.SYNC_EVENT_TYPES:
+                # Must be durable now; write pending events first so the
+                # file stays in chronological order
+                batch, self._buffer = self._buffer, []
+                batch.append(event)
+                self._write_buffered(batch)
+            else:
+                self._buffer.append(event)
+                if len(self._buffer) >= self.BATCH_SIZE:
+                    batch, self._buffer = self._buffer, []
+                    self._write_buffered(batch)
 
         return event
 
@@ -155,24 +528,11 @@ class AuditLogger:
 
         SECURITY: Remove passwords, tokens, and other sensitive fields.
         """
-        sensitive_keys = {
-            "password",
-            "token",
-            "secret",
-            "api_key",
-            "apikey",
-            "authorization",
-            "auth",
-            "credential",
-            "ssn",
-            "credit_card",
-            "card_number",
-        }
+        redacted = _sensitive_keys_in(tuple(details))
 
         sanitized = {}
         for key, value in details.items():
-            key_lower = key.lower()
-            if any(sensitive in key_lower for sensitive in sensitive_keys):
+            if key in redacted:
                 sanitized[key] = "[REDACTED]"
             elif isinstance(value, dict):
                 sanitized[key] = self._sanitize_details(value)
@@ -183,11 +543,28 @@ class AuditLogger:
 
         return sanitized
 
-    def _write_event(self, event: AuditEvent) -> None:
-        """Write event to log file."""
+    def _write_events(self, events: list[AuditEvent]) -> None:
+        """
+        Append a batch of events to the log file in a single write.
+
+        Callers must hold _buffer_lock; the handle stays open between writes
+        and is flushed at every batch boundary.
+        """
         log_file = self._get_log_file()
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(event.model_dump_json() + "\n")
+        # Serialise the field dict directly; details fall back to str()
+        lines = []
+        for event in events:
+            try:
+                lines.append(orjson.dumps(event.__dict__, default=str, option=_ORJSON_OPTIONS))
+            except TypeError:
+                # e.g. non-string details keys; lose this event, not the batch
+                logger.exception("Dropped unserializable audit event %s", event.id)
+                self.dropped_events += 1
+        payload = b"".join(lines)
+        if self._fh is None:
+            self._fh = open(log_file, "ab")
+        self._fh.write(payload)
+        self._fh.flush()
 
     def query(
         self,
@@ -197,10 +574,14 @@ class AuditLogger:
         user_id: str | None = None,
         limit: int = 100,
         offset: int = 0,
+        cursor_ts: datetime | None = None,
+        cursor_id: str | None = None,
     ) -> list[AuditEvent]:
         """
         Query audit logs with filters.
 
+        Events are returned newest first, ordered by (timestamp, id).
+
         SECURITY: This should only be accessible to admin users.
 
         Args:
@@ -210,39 +591,247 @@ class AuditLogger:
             user_id: Filter by user
             limit: Maximum results to return
             offset: Skip this many results
+            cursor_ts: Keyset cursor timestamp - only return events older than this
+            cursor_id: Keyset cursor event ID (tie-breaker for cursor_ts)
 
         Returns:
             List of matching AuditEvent records
         """
+        cursor = (cursor_ts, cursor_id or "") if cursor_ts else None
+        rows = self._iter_rows(start_date, end_date, event_type, user_id, cursor)
+
+        # Pagination pulls only offset + limit rows from the generator, which
+        # stops reading files once it is abandoned. Only the page itself is
+        # materialised as AuditEvent.
         events: list[AuditEvent] = []
+        for row in itertools.islice(rows, offset, offset + limit):
+            try:
+                events.append(AuditEvent.model_validate(row))
+            except ValidationError:
+                continue  # Skip malformed entries
+        return events
+
+    def _iter_rows(
+        self,
+        start_date: datetime | None,
+        end_date: datetime | None,
+        event_type: AuditEventType | None,
+        user_id: str | None,
+        cursor: tuple[datetime, str] | None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield raw log rows matching the filters, newest first."""
+        # A file holds the events flushed on its UTC day, which may include
+        # a few stamped just before midnight, so the upper bound is the day
+        # after the newest wanted timestamp.
+        upper_bounds = [moment for moment in (end_date, cursor and cursor[0]) if moment]
+        last_day = _log_day(min(upper_bounds) + timedelta(days=1)) if upper_bounds else None
+        first_day = _log_day(start_date) if start_date else None
+
+        # start_date is enforced by the early return below rather than the predicate
+        predicate = _compile_predicate(None, end_date, event_type, user_id, cursor)
+
+        # Read from all relevant log files, newest day first
+        for day, log_file in self._log_files():
+            if last_day and day > last_day:
+                continue
+            if first_day and day < first_day:
+                return
+
+            with _open_log(log_file) as f:
+                lines = f.readlines()
+
+            # Entries are appended in time order, so walk backwards and stop
+            # at the first entry older than start_date. Filter on raw fields.
+            for line in reversed(lines):
+                try:
+                    row = orjson.loads(line)
+                    if start_date and datetime.fromisoformat(row["timestamp"]) < start_date:
+                        return
+                    matched = predicate(row)
+                except (ValueError, KeyError, TypeError):
+                    continue  # Skip malformed entries
+                if matched:
+                    yield row
+
+    def count(
+        self,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        event_type: AuditEventType | None = None,
+        user_id: str | None = None,
+    ) -> int:
+        """
+        Count audit events matching the given filters.
+
+        This scans every log file, so callers should only ask for it when
+        the total is actually needed.
 
-        # Read from all relevant log files
-        for log_file in sorted(self.log_dir.glob("audit_*.jsonl"), reverse=True):
-            with open(log_file, "r", encoding="utf-8") as f:
+        Args:
+            start_date: Filter events after this date
+            end_date: Filter events before this date
+            event_type: Filter by event type
+            user_id: Filter by user
+
+        Returns:
+            Number of matching events
+        """
+        predicate = _compile_predicate(start_date, end_date, event_type, user_id, None)
+
+        first_day = _log_day(start_date) if start_date else None
+        last_day = _log_day(end_date + timedelta(days=1)) if end_date else None
+
+        total = 0
+        for day, log_file in self._log_files():
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            with _open_log(log_file) as f:
                 for line in f:
                     try:
-                        event = AuditEvent.model_validate_json(line.strip())
-
-                        # Apply filters
-                        if start_date and event.timestamp < start_date:
-                            continue
-                        if end_date and event.timestamp > end_date:
-                            continue
-                        if event_type and event.event_type != event_type:
-                            continue
-                        if user_id and event.user_id != user_id:
-                            continue
-
-                        events.append(event)
-                    except Exception:
+                        if predicate(orjson.loads(line)):
+                            total += 1
+                    except (ValueError, KeyError, TypeError):
                         continue  # Skip malformed entries
+        return total
+
+    def get_by_id(
+        self,
+        event_id: str,
+        check_owner: Callable[[str | None], None] | None = None,
+    ) -> AuditEvent | None:
+        """
+        Look up a single audit event by ID.
+
+        Event IDs embed their UTC date, so only that day's log file is read.
+
+        Args:
+            event_id: ID returned when the event was logged
+            check_owner: Called with the row's user_id before the event is
+                validated; raise from it to reject the lookup cheaply
+
+        Returns:
+            The matching AuditEvent, or None if it does not exist
+        """
+        if not event_id.startswith("evt_"):
+            return None  # Not an ID we issued
 
-            # Early exit if we have enough events
-            if len(events) >= offset + limit:
-                break
+        stamp = event_id[4:].partition("_")[0]
+        try:
+            if len(stamp) == 20:
+                day = datetime.fromtimestamp(int(stamp) / 1e9, tz=timezone.utc)
+            else:
+                # Legacy evt_<YYYYmmddHHMMSS>_<counter> IDs
+                day = datetime.strptime(stamp[:8], "%Y%m%d")
+        except (ValueError, OverflowError, OSError):
+            return None
+
+        # A buffered event may be flushed just after midnight into the next file
+        for candidate in (day, day + timedelta(days=1)):
+            log_file = self.log_dir / f"audit_{candidate:%Y-%m-%d}.jsonl"
+            if not log_file.exists():
+                log_file = log_file.with_name(log_file.name + ".gz")
+                if not log_file.exists():
+                    continue
+            row = self._find_in_file(log_file, event_id)
+            if row is not None:
+                if check_owner is not None:
+                    check_owner(row.get("user_id"))
+                try:
+                    return AuditEvent.model_validate(row)
+                except ValidationError:
+                    return None  # Malformed entry
+
+        return None
+
+    def _find_in_file(self, log_file: Path, event_id: str) -> dict[str, Any] | None:
+        """Scan one log file for an event ID, returning its raw row."""
+        needle = event_id.encode("utf-8")
+        with _open_log(log_file) as f:
+            for line in f:
+                # Cheap substring test before paying for a full parse
+                if needle not in line:
+                    continue
+                try:
+                    row = orjson.loads(line)
+                    if row["id"] == event_id:
+                        return row
+                except (ValueError, KeyError, TypeError):
+                    continue  # Skip malformed entries
+
+        return None
+
+    def _refresh_rollups(self) -> None:
+        """
+        Fold newly appended log lines into the per-day hourly rollups.
+
+        Only bytes written since the previous refresh are decoded, so closed
+        days cost a single stat() and entries written by other processes are
+        still picked up. Offsets count uncompressed bytes, so a day that is
+        archived after being folded only has its remainder read.
+        """
+        for day, log_file in self._log_files():
+            rollup = self._rollups.setdefault(day, _FileRollup())
+            archived = log_file.suffix == ".gz"
+            if rollup.sealed or (not archived and log_file.stat().st_size == rollup.offset):
+                continue
+
+            with _open_log(log_file) as f:
+                f.seek(rollup.offset)
+                data = f.read()
+            rollup.sealed = archived
+
+            # Leave a partially written trailing line for the next refresh
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                try:
+                    entry = orjson.loads(line)
+                    hour = entry["timestamp"][:13]  # YYYY-MM-DDTHH
+                    rollup.counts[(hour, entry["event_type"])] += 1
+                    if entry.get("user_id"):
+                        rollup.users.add(entry["user_id"])
+                    if entry.get("client_ip"):
+                        rollup.ips.add(entry["client_ip"])
+                except (ValueError, KeyError, TypeError):
+                    continue  # Skip malformed entries
+            rollup.offset += end
+
+    def stats(self, since: datetime) -> AuditStats:
+        """
+        Get aggregate counts from the hourly rollups.
 
-        # Apply pagination
-        return events[offset : offset + limit]
+        Distinct users and IPs for the current UTC day are HyperLogLog
+        estimates, so they cost O(1) however busy the day has been.
+
+        Args:
+            since: Start of the "recent" window (hour granularity)
+
+        Returns:
+            AuditStats with totals by type and recent activity counts
+        """
+        self._refresh_rollups()
+        since_hour = since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H")
+        failure = AuditEventType.LOGIN_FAILURE.value
+
+        events_by_type: Counter[str] = Counter()
+        events_since = 0
+        failed_logins_since = 0
+        for rollup in self._rollups.values():
+            for (hour, event_type), count in rollup.counts.items():
+                events_by_type[event_type] += count
+                if hour >= since_hour:
+                    events_since += count
+                    if event_type == failure:
+                        failed_logins_since += count
+
+        today = self._rollups.get(time.strftime("%Y-%m-%d", time.gmtime()))
+
+        return AuditStats(
+            total_events=sum(events_by_type.values()),
+            events_by_type=dict(events_by_type),
+            events_since=events_since,
+            failed_logins_since=failed_logins_since,
+            unique_users_today=today.users.count() if today else 0,
+            unique_ips_today=today.ips.count() if today else 0,
+        )
 
 
 # Global audit logger instance
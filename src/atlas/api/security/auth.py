@@ -8,17 +8,28 @@ SECURITY: SERVICE ROLE ONLY
 - JWT tokens include unique IDs for revocation support
 """
 
+import base64
+import hashlib
+import hmac
+import itertools
 import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from functools import wraps
 from typing import Annotated, Any, Callable, TypeVar
 
 import bcrypt
 import jwt
+import orjson
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from starlette.concurrency import run_in_threadpool
 
+from atlas.api.security.middleware import get_request_context
 from atlas.api.security.models import TokenPayload, UserProfile, UserRole
 
 # Configuration from environment
@@ -26,8 +37,64 @@ JWT_SECRET_KEY = os.getenv("ATLAS_JWT_SECRET", secrets.token_urlsafe(32))
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = int(os.getenv("ATLAS_JWT_EXPIRATION_HOURS", "24"))
 
+# bcrypt work factor bounds; below the minimum only with ATLAS_ALLOW_WEAK_BCRYPT
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 31
+
+
+def _bcrypt_rounds_from_env() -> int:
+    """
+    Read the bcrypt work factor from ATLAS_BCRYPT_ROUNDS (default 12).
+
+    SECURITY: Values under MIN_BCRYPT_ROUNDS make hashes cheap to brute
+    force, so they are refused unless ATLAS_ALLOW_WEAK_BCRYPT=true is set
+    explicitly (for test suites; bcrypt itself accepts down to 4).
+
+    Raises:
+        ValueError: If the value is not an integer or is out of range
+    """
+    raw = os.getenv("ATLAS_BCRYPT_ROUNDS", "12")
+    try:
+        rounds = int(raw)
+    except ValueError:
+        raise ValueError(f"ATLAS_BCRYPT_ROUNDS must be an integer, got {raw!r}") from None
+
+    allow_weak = os.getenv("ATLAS_ALLOW_WEAK_BCRYPT", "false").lower() == "true"
+    minimum = 4 if allow_weak else MIN_BCRYPT_ROUNDS
+    if not minimum <= rounds <= MAX_BCRYPT_ROUNDS:
+        raise ValueError(
+            f"ATLAS_BCRYPT_ROUNDS must be between {minimum} and {MAX_BCRYPT_ROUNDS}, "
+            f"got {rounds}"
+        )
+    return rounds
+
+
+# bcrypt work factor; calibrate per deployment hardware (each +1 doubles cost)
+BCRYPT_ROUNDS = _bcrypt_rounds_from_env()
+
+# HS256 signing key and the compact header segment every token we issue starts with
+_JWT_KEY = JWT_SECRET_KEY.encode("utf-8")
+_JWT_HEADER_SEGMENT = base64.urlsafe_b64encode(
+    orjson.dumps({"alg": JWT_ALGORITHM, "typ": "JWT"})
+).rstrip(b"=")
+
+# Verified tokens are cached briefly so repeat requests skip signature checks
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("ATLAS_TOKEN_CACHE_TTL", "5"))
+TOKEN_CACHE_MAX_SIZE = 10_000
+
+
+class _ContextHTTPBearer(HTTPBearer):
+    """HTTPBearer that reuses the Authorization header parsed by middleware."""
+
+    async def __call__(self, request: Request) -> HTTPAuthorizationCredentials | None:
+        ctx = get_request_context(request)
+        if not (ctx.auth_scheme and ctx.auth_token) or ctx.auth_scheme.lower() != "bearer":
+            return None
+        return HTTPAuthorizationCredentials(scheme=ctx.auth_scheme, credentials=ctx.auth_token)
+
+
 # Security scheme
-security = HTTPBearer(auto_error=False)
+security = _ContextHTTPBearer(scheme_name="HTTPBearer", auto_error=False)
 
 # Type variable for decorators
 T = TypeVar("T")
@@ -41,7 +108,7 @@ def get_password_hash(password: str) -> str:
     The work factor automatically increases computation time
     to resist brute force attacks.
     """
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
@@ -56,6 +123,21 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     )
 
 
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password without blocking the event loop.
+
+    bcrypt is deliberately CPU-heavy, so async code should use this
+    rather than get_password_hash().
+    """
+    return await run_in_threadpool(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop."""
+    return await run_in_threadpool(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(
     user_id: str,
     email: str,
@@ -80,15 +162,86 @@ def create_access_token(
         "sub": user_id,
         "email": email,
         "role": role.value,
-        "exp": expire,
-        "iat": now,
+        "exp": int(expire.timestamp()),
+        "iat": int(now.timestamp()),
         "jti": secrets.token_urlsafe(16),  # Unique token ID
     }
 
-    token = jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+    token = _encode_hs256(payload)
     return token, expire
 
 
+def _b64url(data: bytes) -> bytes:
+    """Unpadded base64url, as used by JWS compact serialisation."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _encode_hs256(claims: dict[str, Any]) -> str:
+    """
+    Sign claims as a compact HS256 JWT.
+
+    Equivalent to jwt.encode(..., algorithm="HS256") for our fixed header,
+    without PyJWT's per-call algorithm lookup and stdlib JSON encoding.
+    """
+    signing_input = _JWT_HEADER_SEGMENT + b"." + _b64url(orjson.dumps(claims))
+    signature = hmac.new(_JWT_KEY, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64url(signature)).decode("ascii")
+
+
+def _decode_claims(token: str) -> dict[str, Any]:
+    """
+    Verify a token's signature and expiry and return its claims.
+
+    Tokens carrying the exact header we issue are checked directly with
+    hmac; anything else goes through PyJWT, which enforces the algorithm
+    allow-list. Errors are raised as PyJWT exceptions either way.
+
+    SECURITY: Signatures are compared with hmac.compare_digest.
+
+    Raises:
+        jwt.InvalidTokenError: If the token is malformed, forged or expired
+    """
+    raw = token.encode("utf-8")
+    header, _, rest = raw.partition(b".")
+    if header != _JWT_HEADER_SEGMENT:
+        return jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+
+    payload_segment, _, signature = rest.partition(b".")
+    signing_input = header + b"." + payload_segment
+    expected = _b64url(hmac.new(_JWT_KEY, signing_input, hashlib.sha256).digest())
+    if not hmac.compare_digest(expected, signature):
+        raise jwt.InvalidSignatureError("Signature verification failed")
+
+    try:
+        padding = b"=" * (-len(payload_segment) % 4)
+        claims = orjson.loads(base64.urlsafe_b64decode(payload_segment + padding))
+        expires_at = int(claims["exp"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise jwt.DecodeError(f"Invalid payload: {e}") from e
+
+    if expires_at <= time.time():
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    return claims
+
+
+# BLAKE2b-128 of token -> (payload, cache deadline as a Unix timestamp), LRU order
+_token_cache: OrderedDict[bytes, tuple[TokenPayload, float]] = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def invalidate_cached_token(jti: str) -> None:
+    """
+    Drop any cached verification result for a token ID.
+
+    SECURITY: Call this when a token is revoked (e.g. on logout) so a
+    cached result cannot outlive the revocation.
+    """
+    with _token_cache_lock:
+        stale = [key for key, (payload, _) in _token_cache.items() if payload.jti == jti]
+        for key in stale:
+            del _token_cache[key]
+
+
 def verify_token(token: str) -> TokenPayload:
     """
     Verify and decode a JWT token.
@@ -98,12 +251,46 @@ def verify_token(token: str) -> TokenPayload:
     - Checks expiration
     - Returns structured payload
 
+    Successful verifications are cached for TOKEN_CACHE_TTL_SECONDS (never
+    past the token's own expiry), keyed by a 128-bit BLAKE2b digest so raw
+    tokens are never held in memory.
+
     Raises:
         HTTPException: If token is invalid or expired
     """
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+        if cached is not None:
+            if cached[1] > now:
+                _token_cache.move_to_end(key)
+                return cached[0]
+            del _token_cache[key]
+
+    payload = _decode_token(token)
+
+    if TOKEN_CACHE_TTL_SECONDS > 0:
+        deadline = min(now + TOKEN_CACHE_TTL_SECONDS, payload.exp.timestamp())
+        with _token_cache_lock:
+            _token_cache[key] = (payload, deadline)
+            if len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+                _token_cache.popitem(last=False)
+
+    return payload
+
+
+def _decode_token(token: str) -> TokenPayload:
+    """
+    Verify a token's signature and expiry and build its payload.
+
+    SECURITY: The payload is built with model_construct, skipping pydantic
+    validation. That is only sound because the claims were signed by us and
+    have just been verified; never use it on unverified input.
+    """
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        return TokenPayload(
+        payload = _decode_claims(token)
+        return TokenPayload.model_construct(
             sub=payload["sub"],
             email=payload["email"],
             role=UserRole(payload["role"]),
@@ -228,58 +415,86 @@ def require_auth(
     return decorator
 
 
+@dataclass
+class _UserRecord:
+    """Stored user: the client-safe profile plus its password hash."""
+
+    profile: UserProfile
+    password_hash: str
+
+
 # Mock user database for demo purposes
 # SECURITY: In production, use PostgreSQL with RLS enabled
-_mock_users: dict[str, dict[str, Any]] = {
-    "demo@atlas.sa": {
-        "id": "user_001",
-        "email": "demo@atlas.sa",
-        "password_hash": get_password_hash("Demo@123"),
-        "full_name": "Demo User",
-        "role": UserRole.ANALYST,
-        "organization": "Atlas Demo",
-        "created_at": datetime.now(timezone.utc),
-        "last_login": None,
-        "is_active": True,
-        "mfa_enabled": False,
-    }
+_mock_users: dict[str, _UserRecord] = {
+    "demo@atlas.sa": _UserRecord(
+        profile=UserProfile(
+            id="user_001",
+            email="demo@atlas.sa",
+            full_name="Demo User",
+            role=UserRole.ANALYST,
+            organization="Atlas Demo",
+            created_at=datetime.now(timezone.utc),
+            last_login=None,
+            is_active=True,
+            mfa_enabled=False,
+        ),
+        password_hash=get_password_hash("Demo@123"),
+    )
 }
 
+# Compared against for unknown emails so they cost the same single bcrypt
+# check as a wrong password for a real user
+_DUMMY_PASSWORD_HASH = get_password_hash("dummy")
+
+_user_id_counter = itertools.count(len(_mock_users) + 1)
+
+
+def _next_user_id() -> str:
+    """Allocate the next sequential mock user ID."""
+    return f"user_{next(_user_id_counter):03d}"
+
+
+def _find_user(email: str) -> _UserRecord | None:
+    """
+    Look up a user record by email.
+
+    SECURITY: Every stored email is compared with hmac.compare_digest and
+    the scan never stops early, so lookup time does not reveal whether or
+    where the email exists.
+    """
+    wanted = email.encode("utf-8")
+    found = None
+    for stored_email, record in _mock_users.items():
+        if hmac.compare_digest(stored_email.encode("utf-8"), wanted):
+            found = record
+    return found
+
 
 async def authenticate_user(email: str, password: str) -> UserProfile | None:
     """
     Authenticate a user with email and password.
 
     SECURITY:
-    - Password is verified using constant-time comparison
+    - Password is verified using constant-time comparison (bcrypt.checkpw)
+    - Email lookup is constant-time, and unknown emails still pay one bcrypt check
     - Failed attempts should be rate-limited (see middleware)
 
     Returns:
         UserProfile if authentication succeeds, None otherwise
     """
-    user_data = _mock_users.get(email)
-    if not user_data:
-        # Still perform hash comparison to prevent timing attacks
-        verify_password(password, get_password_hash("dummy"))
+    record = _find_user(email)
+    if not record:
+        # Still perform one hash comparison to prevent timing attacks
+        await verify_password_async(password, _DUMMY_PASSWORD_HASH)
         return None
 
-    if not user_data["is_active"]:
+    if not record.profile.is_active:
         return None
 
-    if not verify_password(password, user_data["password_hash"]):
+    if not await verify_password_async(password, record.password_hash):
         return None
 
-    # Update last login
-    user_data["last_login"] = datetime.now(timezone.utc)
-
-    return UserProfile(
-        id=user_data["id"],
-        email=user_data["email"],
-        full_name=user_data["full_name"],
-        role=user_data["role"],
-        organization=user_data["organization"],
-        created_at=user_data["created_at"],
-        last_login=user_data["last_login"],
-        is_active=user_data["is_active"],
-        mfa_enabled=user_data["mfa_enabled"],
-    )
+    # Update last login (profiles are immutable, so swap in an updated copy)
+    record.profile = record.profile.model_copy(update={"last_login": datetime.now(timezone.utc)})
+
+    return record.profile
@@ -2,22 +2,131 @@
 Security Middleware for Atlas API
 
 SECURITY: Defense-in-depth through middleware layers.
+All middleware is plain ASGI, avoiding BaseHTTPMiddleware's per-request
+task group and response streaming overhead.
+- Request context (client IP, bearer token) parsed once per request
 - Rate limiting to prevent brute force attacks
 - Security headers for browser protection
 - Request logging for audit trails
 """
 
+import itertools
+import os
 import time
-from collections import defaultdict
-from datetime import datetime, timezone
-from typing import Callable
+from collections import defaultdict, deque
+from dataclasses import dataclass
 
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+import orjson
+from fastapi import FastAPI, Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from atlas.api.clock import now_iso
+from atlas.api.security.siem import get_siem_forwarder
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+# Request IDs: a random per-process prefix plus a counter, unique without
+# per-request randomness and without exposing memory addresses
+_REQUEST_ID_PREFIX = os.urandom(8).hex()
+_request_counter = itertools.count()
+
+
+@dataclass(slots=True)
+class RequestContext:
+    """Per-request values parsed once from the ASGI scope."""
+
+    request_id: str
+    client_ip: str
+    auth_scheme: str
+    auth_token: str
+
+
+def _parse_request_context(scope: Scope) -> RequestContext:
+    """
+    Assign a request ID and read the client IP and Authorization header in
+    one pass over the headers.
+
+    The client IP is the first X-Forwarded-For entry when present (behind
+    load balancer/proxy), otherwise the socket peer address, or "" if
+    neither is known.
+    """
+    authorization = forwarded_for = None
+    for name, value in scope["headers"]:
+        if name == b"authorization" and authorization is None:
+            authorization = value.decode("latin-1")
+        elif name == b"x-forwarded-for" and forwarded_for is None:
+            forwarded_for = value.decode("latin-1")
+
+    client_ip = forwarded_for.partition(",")[0].strip() if forwarded_for else ""
+    if not client_ip and scope.get("client"):
+        client_ip = scope["client"][0]
+
+    auth_scheme, _, auth_token = (authorization or "").partition(" ")
+    return RequestContext(
+        request_id=f"{_REQUEST_ID_PREFIX}{next(_request_counter):08x}",
+        client_ip=client_ip,
+        auth_scheme=auth_scheme,
+        auth_token=auth_token.strip(),
+    )
+
+
+def _scope_context(scope: Scope) -> RequestContext:
+    """Return the context stored by RequestContextMiddleware, or parse it now."""
+    ctx = scope.get("state", {}).get("ctx")
+    if ctx is None:
+        ctx = _parse_request_context(scope)
+    return ctx
+
+
+def get_request_context(request: Request) -> RequestContext:
+    """
+    Get the parsed context for a request.
+
+    Reuses what RequestContextMiddleware stored on request.state, and
+    parses the headers directly when it is not installed.
+    """
+    return _scope_context(request.scope)
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Extract the client IP, considering proxies.
+
+    Returns:
+        The client IP, or an empty string if it cannot be determined
+    """
+    return get_request_context(request).client_ip
+
+
+class RequestContextMiddleware:
+    """
+    Parse request ID, client IP and credentials once; share as request.state.ctx.
+
+    Must run before every other middleware that needs them. Later
+    middleware and dependencies read the stored RequestContext instead of
+    scanning the headers again.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["ctx"] = _parse_request_context(scope)
+        await self.app(scope, receive, send)
+
+
+# Rate-limit window: one minute in nanoseconds
+_RATE_LIMIT_WINDOW_NS = 60_000_000_000
+
+# 429 response, encoded once; bursts of rejections allocate nothing
+_RATE_LIMITED_BODY = orjson.dumps({"detail": "Rate limit exceeded. Please try again later."})
+_RATE_LIMITED_HEADERS = (
+    (b"content-type", b"application/json"),
+    (b"retry-after", b"60"),
+    (b"content-length", str(len(_RATE_LIMITED_BODY)).encode("ascii")),
+)
+
+
+class RateLimitMiddleware:
     """
     Rate limiting middleware to prevent abuse.
 
@@ -33,54 +142,125 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         requests_per_minute: int = 60,
         auth_requests_per_minute: int = 10,
     ):
-        super().__init__(app)
+        """
+        Initialize the rate limiter.
+
+        Args:
+            app: Downstream ASGI application
+            requests_per_minute: Per-IP limit for most endpoints
+            auth_requests_per_minute: Stricter per-IP limit for /api/auth
+
+        Raises:
+            ValueError: If either limit is below 1
+        """
+        # A limit of 0 would index recent[-0], i.e. the oldest entry
+        if requests_per_minute < 1 or auth_requests_per_minute < 1:
+            raise ValueError("Rate limits must allow at least 1 request per minute")
+
+        self.app = app
         self.requests_per_minute = requests_per_minute
         self.auth_requests_per_minute = auth_requests_per_minute
-        self.request_counts: dict[str, list[float]] = defaultdict(list)
-
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract client IP, considering proxies."""
-        # Check for forwarded IP (behind load balancer/proxy)
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        return request.client.host if request.client else "unknown"
-
-    def _clean_old_requests(self, ip: str, window_seconds: int = 60) -> None:
-        """Remove request timestamps older than the window."""
-        now = time.time()
-        self.request_counts[ip] = [
-            ts for ts in self.request_counts[ip] if now - ts < window_seconds
-        ]
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        client_ip = self._get_client_ip(request)
-        self._clean_old_requests(client_ip)
+        # Per-IP ring buffer of recent request times (monotonic ns); only the newest `limit`
+        # entries can decide a limit, so older ones are dropped on append
+        window_size = max(requests_per_minute, auth_requests_per_minute)
+        self.request_counts: dict[str, deque[int]] = defaultdict(
+            lambda: deque(maxlen=window_size)
+        )
+        # Next time idle IPs are swept out, so the map doesn't grow without bound
+        self._next_sweep_ns = time.monotonic_ns() + _RATE_LIMIT_WINDOW_NS
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        now = time.monotonic_ns()
+        if now >= self._next_sweep_ns:
+            self._evict_idle(now)
+
+        client_ip = _scope_context(scope).client_ip or "unknown"
+        recent = self.request_counts[client_ip]
 
         # Determine rate limit based on endpoint
-        is_auth_endpoint = request.url.path.startswith("/api/auth")
+        is_auth_endpoint = scope["path"].startswith("/api/auth")
         limit = (
             self.auth_requests_per_minute if is_auth_endpoint else self.requests_per_minute
         )
 
-        # Check rate limit
-        if len(self.request_counts[client_ip]) >= limit:
-            return Response(
-                content='{"detail": "Rate limit exceeded. Please try again later."}',
-                status_code=429,
-                headers={
-                    "Content-Type": "application/json",
-                    "Retry-After": "60",
-                },
+        # Over the limit if the limit-th most recent request is inside the window
+        if len(recent) >= limit and now - recent[-limit] < _RATE_LIMIT_WINDOW_NS:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 429,
+                    "headers": _RATE_LIMITED_HEADERS,
+                }
             )
+            await send({"type": "http.response.body", "body": _RATE_LIMITED_BODY})
+            return
 
         # Record this request
-        self.request_counts[client_ip].append(time.time())
-
-        return await call_next(request)
-
-
-class SecurityMiddleware(BaseHTTPMiddleware):
+        recent.append(now)
+
+        await self.app(scope, receive, send)
+
+    def _evict_idle(self, now: int) -> None:
+        """
+        Drop IPs with no request inside the window.
+
+        Their history can no longer affect a limit. Runs at most once per
+        window, so the scan is amortized across every request in it.
+        """
+        cutoff = now - _RATE_LIMIT_WINDOW_NS
+        idle = [ip for ip, recent in self.request_counts.items() if recent[-1] <= cutoff]
+        for ip in idle:
+            del self.request_counts[ip]
+        self._next_sweep_ns = now + _RATE_LIMIT_WINDOW_NS
+
+
+# Security headers added to every response, pre-encoded once at import
+_SECURITY_HEADERS: list[tuple[bytes, bytes]] = [
+    # Prevent clickjacking
+    (b"x-frame-options", b"DENY"),
+    # Prevent content type sniffing
+    (b"x-content-type-options", b"nosniff"),
+    # XSS Protection (legacy, but still useful)
+    (b"x-xss-protection", b"1; mode=block"),
+    # Referrer policy
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    # Content Security Policy for API
+    (b"content-security-policy", b"default-src 'none'; frame-ancestors 'none'"),
+    # Permissions Policy
+    (b"permissions-policy", b"geolocation=(), microphone=(), camera=()"),
+]
+
+# API responses additionally must not be cached (sensitive data)
+_API_SECURITY_HEADERS: list[tuple[bytes, bytes]] = [
+    *_SECURITY_HEADERS,
+    (b"cache-control", b"no-store, max-age=0"),
+    (b"pragma", b"no-cache"),
+]
+_API_SECURITY_HEADER_NAMES = frozenset(name for name, _ in _API_SECURITY_HEADERS)
+
+
+def _is_api_path(path: str) -> bool:
+    """Whether a path serves API data."""
+    return path.startswith(("/api/", "/v1/"))
+
+
+def _add_security_headers(
+    raw_headers: list[tuple[bytes, bytes]], path: str
+) -> list[tuple[bytes, bytes]]:
+    """Append pre-encoded security headers, replacing any the app already set."""
+    headers = _API_SECURITY_HEADERS if _is_api_path(path) else _SECURITY_HEADERS
+    if any(name in _API_SECURITY_HEADER_NAMES for name, _ in raw_headers):
+        owned = {name for name, _ in headers}
+        raw_headers = [header for header in raw_headers if header[0] not in owned]
+    raw_headers.extend(headers)
+    return raw_headers
+
+
+class SecurityMiddleware:
     """
     Security headers middleware.
 
@@ -91,40 +271,25 @@ class SecurityMiddleware(BaseHTTPMiddleware):
     - Sets strict CSP for API responses
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Prevent content type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = _add_security_headers(
+                    list(message.get("headers", ())), scope["path"]
+                )
+            await send(message)
 
-        # XSS Protection (legacy, but still useful)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
+        await self.app(scope, receive, send_with_headers)
 
-        # Referrer policy
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
 
-        # Content Security Policy for API
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'none'; frame-ancestors 'none'"
-        )
-
-        # Permissions Policy
-        response.headers["Permissions-Policy"] = (
-            "geolocation=(), microphone=(), camera=()"
-        )
-
-        # Cache control for sensitive data
-        if request.url.path.startswith("/api/") or request.url.path.startswith("/v1/"):
-            response.headers["Cache-Control"] = "no-store, max-age=0"
-            response.headers["Pragma"] = "no-cache"
-
-        return response
-
-
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """
     Request logging middleware for audit purposes.
 
@@ -132,40 +297,61 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
     - Captures request metadata (not body for privacy)
     - Records response status and timing
     - Integrates with audit logging system
-    """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
-
-        # Get client info
-        client_ip = request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
-        if not client_ip and request.client:
-            client_ip = request.client.host
-
-        # Process request
-        response = await call_next(request)
-
-        # Calculate duration
-        duration_ms = (time.time() - start_time) * 1000
-
-        # Log request (in production, send to structured logging)
-        # For now, we construct the log entry for future SIEM integration
-        _log_entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "method": request.method,
-            "path": request.url.path,
-            "status_code": response.status_code,
-            "duration_ms": round(duration_ms, 2),
-            "client_ip": client_ip,
-            "user_agent": request.headers.get("User-Agent", "")[:200],
-        }
-        # TODO: Send to SIEM/logging system
-        del _log_entry  # Explicitly mark as intentionally unused for now
-
-        # Add security-relevant headers to response
-        response.headers["X-Request-ID"] = str(id(request))
+    With add_security_headers=True it also does SecurityMiddleware's job
+    in the same send wrapper, saving a middleware layer per request.
+    """
 
-        return response
+    def __init__(self, app: ASGIApp, add_security_headers: bool = False):
+        self.app = app
+        self.add_security_headers = add_security_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_ns = time.monotonic_ns()
+        ctx = _scope_context(scope)
+        request_id = ctx.request_id.encode("ascii")
+        status_code = 500  # Reported if the app fails before responding
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add security-relevant headers to response
+                raw_headers = [*message.get("headers", ()), (b"x-request-id", request_id)]
+                if self.add_security_headers:
+                    raw_headers = _add_security_headers(raw_headers, scope["path"])
+                message["headers"] = raw_headers
+            await send(message)
+
+        # Process request; the entry is forwarded even if the app raises
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            # Calculate duration
+            duration_ms = (time.monotonic_ns() - start_ns) / 1_000_000
+
+            # Forward to the SIEM, if configured (queued; written off-thread)
+            siem = get_siem_forwarder()
+            if siem is not None:
+                user_agent = next(
+                    (value for name, value in scope["headers"] if name == b"user-agent"), b""
+                )
+                siem.forward(
+                    {
+                        "timestamp": now_iso(),
+                        "request_id": ctx.request_id,
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status_code": status_code,
+                        "duration_ms": round(duration_ms, 2),
+                        "client_ip": ctx.client_ip,
+                        "user_agent": user_agent.decode("latin-1")[:200],
+                    }
+                )
 
 
 def setup_security_middleware(app: FastAPI) -> None:
@@ -176,11 +362,13 @@ def setup_security_middleware(app: FastAPI) -> None:
         app = FastAPI()
         setup_security_middleware(app)
     """
-    # Add middleware in reverse order (last added = first executed)
-    app.add_middleware(RequestLoggingMiddleware)
-    app.add_middleware(SecurityMiddleware)
+    # Add middleware in reverse order (last added = first executed).
+    # Security headers ride on the logging layer's send wrapper rather than
+    # a separate SecurityMiddleware, keeping the stack one layer shorter.
+    app.add_middleware(RequestLoggingMiddleware, add_security_headers=True)
     app.add_middleware(
         RateLimitMiddleware,
         requests_per_minute=60,
         auth_requests_per_minute=10,
     )
+    app.add_middleware(RequestContextMiddleware)
@@ -5,26 +5,101 @@ SECURITY: TRUST NO ONE - Validate ALL inputs on the server side.
 All API endpoints MUST use these models for request validation.
 """
 
+import inspect
 import re
 from datetime import datetime
 from enum import Enum
-from functools import wraps
-from typing import Any, Callable, TypeVar
+from functools import lru_cache, wraps
+from typing import Annotated, Any, Callable, TypeVar
 
 from pydantic import (
+    AfterValidator,
     BaseModel,
     ConfigDict,
-    EmailStr,
     Field,
     SecretStr,
+    WithJsonSchema,
     field_validator,
     model_validator,
 )
+from pydantic.networks import validate_email
 
 # Type variable for generic validation decorator
 T = TypeVar("T")
 
 
+def _check_password_strength(password: str) -> None:
+    """
+    Enforce the minimum password policy shared by login and registration.
+
+    Raises:
+        ValueError: Naming the first requirement the password fails
+    """
+    if len(password) < 8:
+        raise ValueError("Password must be at least 8 characters")
+
+    # One scan for all three classes, stopping as soon as each has been seen
+    has_upper = has_lower = has_digit = False
+    for c in password:
+        if "A" <= c <= "Z":
+            has_upper = True
+        elif "a" <= c <= "z":
+            has_lower = True
+        elif c.isdecimal():
+            # Non-ASCII decimal digits (e.g. Arabic-Indic) count, as with \d
+            has_digit = True
+        else:
+            continue
+        if has_upper and has_lower and has_digit:
+            break
+
+    if not has_upper:
+        raise ValueError("Password must contain at least one uppercase letter")
+    if not has_lower:
+        raise ValueError("Password must contain at least one lowercase letter")
+    if not has_digit:
+        raise ValueError("Password must contain at least one digit")
+
+
+@lru_cache(maxsize=10_000)
+def _normalize_email(value: str) -> str:
+    """
+    Validate and normalize an email address, as EmailStr does.
+
+    The same few addresses are validated on every login and token check,
+    and email-validator's parser is slow, so results are memoized. Invalid
+    addresses raise and are therefore never cached.
+    """
+    return validate_email(value)[1]
+
+
+# Drop-in for EmailStr with cached validation and the same JSON schema
+EmailAddress = Annotated[
+    str,
+    AfterValidator(_normalize_email),
+    WithJsonSchema({"type": "string", "format": "email"}),
+]
+
+
+# Question cleanup: drop null bytes in one translate pass, collapse whitespace runs
+_QUESTION_DELETE_TABLE = {0: None}
+_WHITESPACE_RUN = re.compile(r"\s+")
+
+
+def clean_question(question: str) -> str:
+    """
+    Remove null bytes and collapse whitespace in a natural language question.
+
+    Raises:
+        ValueError: If fewer than 3 characters remain after cleanup
+    """
+    question = _WHITESPACE_RUN.sub(" ", question.translate(_QUESTION_DELETE_TABLE)).strip()
+    # Basic length check after sanitization
+    if len(question) < 3:
+        raise ValueError("Question must be at least 3 characters after cleanup")
+    return question
+
+
 class UserRole(str, Enum):
     """User roles for RBAC enforcement."""
 
@@ -39,7 +114,7 @@ class AuthRequest(BaseModel):
 
     model_config = ConfigDict(str_strip_whitespace=True)
 
-    email: EmailStr = Field(..., description="User email address")
+    email: EmailAddress = Field(..., description="User email address")
     password: SecretStr = Field(
         ..., min_length=8, max_length=128, description="User password"
     )
@@ -48,15 +123,7 @@ class AuthRequest(BaseModel):
     @classmethod
     def validate_password_strength(cls, v: SecretStr) -> SecretStr:
         """Ensure password meets minimum security requirements."""
-        password = v.get_secret_value()
-        if len(password) < 8:
-            raise ValueError("Password must be at least 8 characters")
-        if not re.search(r"[A-Z]", password):
-            raise ValueError("Password must contain at least one uppercase letter")
-        if not re.search(r"[a-z]", password):
-            raise ValueError("Password must contain at least one lowercase letter")
-        if not re.search(r"\d", password):
-            raise ValueError("Password must contain at least one digit")
+        _check_password_strength(v.get_secret_value())
         return v
 
 
@@ -65,7 +132,7 @@ class RegisterRequest(BaseModel):
 
     model_config = ConfigDict(str_strip_whitespace=True)
 
-    email: EmailStr = Field(..., description="User email address")
+    email: EmailAddress = Field(..., description="User email address")
     password: SecretStr = Field(
         ..., min_length=8, max_length=128, description="User password"
     )
@@ -88,21 +155,15 @@ class RegisterRequest(BaseModel):
     @classmethod
     def validate_password_strength(cls, v: SecretStr) -> SecretStr:
         """Ensure password meets minimum security requirements."""
-        password = v.get_secret_value()
-        if len(password) < 8:
-            raise ValueError("Password must be at least 8 characters")
-        if not re.search(r"[A-Z]", password):
-            raise ValueError("Password must contain at least one uppercase letter")
-        if not re.search(r"[a-z]", password):
-            raise ValueError("Password must contain at least one lowercase letter")
-        if not re.search(r"\d", password):
-            raise ValueError("Password must contain at least one digit")
+        _check_password_strength(v.get_secret_value())
         return v
 
 
 class AuthResponse(BaseModel):
     """Authentication response."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     access_token: str
     token_type: str = "bearer"
     expires_at: datetime
@@ -112,8 +173,10 @@ class AuthResponse(BaseModel):
 class TokenPayload(BaseModel):
     """JWT token payload with validation."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     sub: str = Field(..., description="User ID (subject)")
-    email: EmailStr
+    email: EmailAddress
     role: UserRole
     exp: datetime
     iat: datetime
@@ -123,8 +186,10 @@ class TokenPayload(BaseModel):
 class UserProfile(BaseModel):
     """User profile data (safe to expose to client)."""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     id: str
-    email: EmailStr
+    email: EmailAddress
     full_name: str
     role: UserRole
     organization: str | None = None
@@ -154,14 +219,7 @@ class ChatRequestValidated(BaseModel):
     @classmethod
     def sanitize_question(cls, v: str) -> str:
         """Sanitize the question to prevent potential injection."""
-        # Remove null bytes
-        v = v.replace("\x00", "")
-        # Remove excessive whitespace
-        v = " ".join(v.split())
-        # Basic length check after sanitization
-        if len(v) < 3:
-            raise ValueError("Question must be at least 3 characters after cleanup")
-        return v
+        return clean_question(v)
 
 
 class AuditLogQuery(BaseModel):
@@ -204,16 +262,30 @@ def validate_input(model: type[BaseModel]) -> Callable[[Callable[..., T]], Calla
         @validate_input(CreateUserRequest)
         async def create_user(request: CreateUserRequest):
             ...
+
+    Raises:
+        TypeError: At decoration time, if no parameter is annotated with the model
     """
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        # Resolve the parameter annotated with the model once, not per call
+        target = next(
+            (
+                name
+                for name, param in inspect.signature(func).parameters.items()
+                if param.annotation in (model, model.__name__)
+            ),
+            None,
+        )
+        if target is None:
+            raise TypeError(f"{func.__qualname__} has no parameter annotated as {model.__name__}")
+
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> T:
-            # Find the request body in kwargs
-            for key, value in kwargs.items():
-                if isinstance(value, dict):
-                    # Validate and replace with model instance
-                    kwargs[key] = model(**value)
+            value = kwargs.get(target)
+            if isinstance(value, dict):
+                # Validate and replace with model instance
+                kwargs[target] = model(**value)
             return await func(*args, **kwargs)
 
         return wrapper
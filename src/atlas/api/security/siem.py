@@ -0,0 +1,162 @@
+"""
+SIEM Forwarding for Atlas API
+
+SECURITY: Request logs are shipped for security monitoring.
+- Entries are written as JSONL to daily files a SIEM agent can tail
+- Closed days are gzipped on rotation for cheaper storage and shipping
+- Writes happen on a background thread, never on the request path
+- Forwarding is opt-in via ATLAS_SIEM_LOG_DIR
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import orjson
+
+from atlas.api.security.audit import gzip_log_file
+
+logger = logging.getLogger(__name__)
+
+# Sentinel telling the writer thread to drain and exit
+_STOP = object()
+
+
+class SIEMForwarder:
+    """
+    Forward request log entries to daily JSONL files.
+
+    forward() only enqueues the entry. A daemon thread drains the queue in
+    batches through one persistent file handle per UTC day, so request
+    handling never waits on disk I/O. The current day stays plain JSONL
+    so it can be tailed; when the day rotates the writer gzips the file it
+    just closed (and, at startup, any older day left uncompressed).
+
+    A failed write drops that batch and the writer carries on. The queue is
+    bounded, so if the disk stalls or the writer dies, entries are dropped
+    (and counted in dropped_entries) rather than held in memory.
+    """
+
+    # Maximum entries written per batch
+    BATCH_SIZE = 100
+
+    # Maximum entries waiting to be written before new ones are dropped
+    MAX_QUEUED = 10_000
+
+    def __init__(self, log_dir: str):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=self.MAX_QUEUED)
+        self.dropped_entries = 0
+        self._day: str | None = None
+        self._fh: BinaryIO | None = None
+
+        self._thread = threading.Thread(target=self._run, name="siem-forwarder", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def forward(self, entry: dict[str, Any]) -> None:
+        """Queue a log entry for writing, dropping it if the writer cannot keep up."""
+        if self._thread.is_alive():
+            try:
+                self._queue.put_nowait(entry)
+                return
+            except queue.Full:
+                pass
+        self.dropped_entries += 1
+
+    def close(self) -> None:
+        """Write any queued entries and stop the writer thread."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=5)
+        except queue.Full:
+            return
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        """Writer loop: block for one entry, then drain a batch behind it."""
+        today = time.strftime("%Y-%m-%d", time.gmtime())
+        for log_file in self.log_dir.glob("requests_*.jsonl"):
+            if log_file.stem.removeprefix("requests_") < today:
+                self._archive(log_file)
+
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = any(entry is _STOP for entry in batch)
+            entries = [entry for entry in batch if entry is not _STOP]
+            try:
+                self._write(entries)
+            except Exception:
+                # Drop this batch but keep the writer alive for the next one
+                logger.exception("SIEM write failed; dropped %d entries", len(entries))
+                self.dropped_entries += len(entries)
+                self._close_handle()
+            if stopping:
+                self._close_handle()
+                return
+
+    def _close_handle(self) -> None:
+        """Close the current day's file, if open."""
+        fh, self._fh = self._fh, None
+        if fh is not None:
+            try:
+                fh.close()
+            except OSError:
+                logger.exception("Failed to close SIEM log %s", fh.name)
+
+    def _archive(self, log_file: Path) -> None:
+        """Gzip a closed day, leaving it uncompressed if that fails."""
+        try:
+            gzip_log_file(log_file, compresslevel=6)
+        except OSError:
+            # Retried at the next startup
+            logger.exception("Failed to gzip SIEM log %s", log_file)
+
+    def _write(self, entries: list[dict[str, Any]]) -> None:
+        """Append entries to the current day's file, rotating at UTC midnight."""
+        if not entries:
+            return
+
+        day = time.strftime("%Y-%m-%d", time.gmtime())
+        if day != self._day or self._fh is None:
+            if self._fh is not None:
+                # Rotated: archive the day just closed
+                closed = Path(self._fh.name)
+                self._close_handle()
+                self._archive(closed)
+            self._day = day
+            self._fh = open(self.log_dir / f"requests_{day}.jsonl", "ab")
+
+        self._fh.write(
+            b"".join(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE) for entry in entries)
+        )
+        self._fh.flush()
+
+
+# Global forwarder instance
+_siem_forwarder: SIEMForwarder | None = None
+
+
+def get_siem_forwarder() -> SIEMForwarder | None:
+    """Get or create the global forwarder, or None if ATLAS_SIEM_LOG_DIR is unset."""
+    global _siem_forwarder
+    if _siem_forwarder is None:
+        log_dir = os.getenv("ATLAS_SIEM_LOG_DIR")
+        if not log_dir:
+            return None
+        _siem_forwarder = SIEMForwarder(log_dir)
+    return _siem_forwarder
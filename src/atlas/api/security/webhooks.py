@@ -10,8 +10,81 @@ SECURITY: VERIFY SIGNATURES - NEVER trust webhook payloads directly.
 import hashlib
 import hmac
 import os
+import threading
 import time
-from typing import Any
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable
+
+import orjson
+
+# Maximum age of a timestamped webhook, in seconds
+DEFAULT_TOLERANCE_SECONDS = 300
+
+# Upper bounds on attacker-controlled signature headers, checked before any
+# parsing or hashing. A hex HMAC-SHA256 is 64 characters; Stripe headers carry
+# a timestamp and a few signatures.
+_MAX_SIGNATURE_LENGTH = 128
+_MAX_STRIPE_HEADER_LENGTH = 4096
+
+# How long an opt-in WebhookHandler verification cache trusts a repeat delivery
+VERIFICATION_CACHE_TTL_SECONDS = 60
+
+
+# SHA-256 block size, and translate tables XOR-ing each key byte with the
+# HMAC ipad/opad constants (RFC 2104)
+_SHA256_BLOCK_SIZE = 64
+_IPAD = bytes(x ^ 0x36 for x in range(256))
+_OPAD = bytes(x ^ 0x5C for x in range(256))
+
+
+@lru_cache(maxsize=32)
+def _hmac_states(secret: bytes | str) -> tuple[Any, Any]:
+    """
+    Inner and outer SHA-256 states of HMAC-SHA256 keyed with a secret.
+
+    Webhook endpoints reuse a handful of secrets, so the key setup (ipad/opad
+    derivation and their two SHA-256 blocks) is done once per secret.
+    Callers must .copy() the states before updating them. str secrets are
+    UTF-8 encoded; bytes are used as-is.
+    """
+    if isinstance(secret, str):
+        secret = secret.encode("utf-8")
+    if len(secret) > _SHA256_BLOCK_SIZE:
+        secret = hashlib.sha256(secret).digest()
+    secret = secret.ljust(_SHA256_BLOCK_SIZE, b"\0")
+    inner = hashlib.sha256(secret.translate(_IPAD))
+    outer = hashlib.sha256(secret.translate(_OPAD))
+    return inner, outer
+
+
+def _hmac_sha256(secret: bytes | str, *parts: bytes) -> bytes:
+    """
+    HMAC-SHA256 digest of the concatenated parts, from the cached keyed states.
+
+    Byte-identical to hmac.new(secret, message, hashlib.sha256).digest(),
+    but drives hashlib directly. Parts are fed with separate update() calls,
+    so a prefix such as a timestamp never forces a copy of the whole payload.
+    """
+    inner, outer = _hmac_states(secret)
+    inner = inner.copy()
+    for part in parts:
+        inner.update(part)
+    outer = outer.copy()
+    outer.update(inner.digest())
+    return outer.digest()
+
+
+def _signature_matches(signature: str, expected: bytes) -> bool:
+    """
+    Compare a hex signature from a header against a raw digest.
+
+    SECURITY: Compared in constant time against the lowercase hex digest,
+    so only the exact 64-character form matches; uppercase or whitespace
+    variants are rejected. Encoding first keeps non-ASCII input a mismatch
+    rather than a TypeError.
+    """
+    return hmac.compare_digest(signature.encode("utf-8"), expected.hex().encode("ascii"))
 
 
 class WebhookVerificationError(Exception):
@@ -26,9 +99,9 @@ class WebhookVerificationError(Exception):
 def verify_webhook_signature(
     payload: bytes,
     signature: str,
-    secret: str,
+    secret: bytes | str,
     timestamp: int | None = None,
-    tolerance_seconds: int = 300,
+    tolerance_seconds: int = DEFAULT_TOLERANCE_SECONDS,
 ) -> bool:
     """
     Verify a webhook signature using HMAC-SHA256.
@@ -41,7 +114,7 @@ def verify_webhook_signature(
     Args:
         payload: Raw request body as bytes
         signature: Signature from webhook header
-        secret: Webhook signing secret
+        secret: Webhook signing secret, str or UTF-8 bytes
         timestamp: Unix timestamp from webhook header (optional)
         tolerance_seconds: Maximum age of webhook in seconds
 
@@ -51,6 +124,9 @@ def verify_webhook_signature(
     Raises:
         WebhookVerificationError: If verification fails with details
     """
+    if len(signature) > _MAX_SIGNATURE_LENGTH:
+        raise WebhookVerificationError("Signature header too large")
+
     # Check timestamp to prevent replay attacks
     if timestamp is not None:
         current_time = int(time.time())
@@ -63,28 +139,55 @@ def verify_webhook_signature(
     # Compute expected signature
     if timestamp is not None:
         # Include timestamp in signature (Stripe-style)
-        signed_payload = f"{timestamp}.".encode() + payload
+        expected_signature = _hmac_sha256(secret, f"{timestamp}.".encode(), payload)
     else:
-        signed_payload = payload
-
-    expected_signature = hmac.new(
-        secret.encode("utf-8"),
-        signed_payload,
-        hashlib.sha256,
-    ).hexdigest()
+        expected_signature = _hmac_sha256(secret, payload)
 
     # Constant-time comparison
-    if not hmac.compare_digest(signature, expected_signature):
+    if not _signature_matches(signature, expected_signature):
         raise WebhookVerificationError("Invalid webhook signature")
 
     return True
 
 
+def _parse_payload(payload: bytes) -> dict[str, Any]:
+    """
+    Parse a verified JSON body straight from bytes.
+
+    Raises:
+        WebhookVerificationError: If the body is not valid JSON
+    """
+    try:
+        return orjson.loads(payload)
+    except orjson.JSONDecodeError as e:
+        raise WebhookVerificationError(f"Invalid JSON payload: {e}")
+
+
+def _parse_stripe_header(signature_header: str) -> tuple[str | None, list[str]]:
+    """
+    Pull the timestamp and v1 signatures out of a Stripe-Signature header.
+
+    Format: t=timestamp,v1=signature,v0=signature(deprecated). While a
+    signing secret is being rolled, Stripe sends one v1 per active secret.
+
+    Returns:
+        (timestamp or None if absent, all v1 signatures in header order)
+    """
+    timestamp = None
+    signatures = []
+    for part in signature_header.split(","):
+        if part.startswith("t="):
+            timestamp = part[2:]
+        elif part.startswith("v1="):
+            signatures.append(part[3:])
+    return timestamp, signatures
+
+
 def verify_stripe_signature(
     payload: bytes,
     signature_header: str,
-    secret: str,
-    tolerance_seconds: int = 300,
+    secret: bytes | str,
+    tolerance_seconds: int = DEFAULT_TOLERANCE_SECONDS,
 ) -> dict[str, Any]:
     """
     Verify a Stripe webhook signature.
@@ -95,7 +198,7 @@ def verify_stripe_signature(
     Args:
         payload: Raw request body
         signature_header: Stripe-Signature header value
-        secret: Webhook signing secret (whsec_...)
+        secret: Webhook signing secret (whsec_...), str or UTF-8 bytes
         tolerance_seconds: Maximum age of webhook
 
     Returns:
@@ -104,20 +207,35 @@ def verify_stripe_signature(
     Raises:
         WebhookVerificationError: If verification fails
     """
-    import json
+    return _parse_payload(
+        verify_stripe_signature_raw(payload, signature_header, secret, tolerance_seconds)
+    )
 
-    # Parse Stripe signature header
-    # Format: t=timestamp,v1=signature,v0=signature(deprecated)
-    elements = {}
-    for part in signature_header.split(","):
-        if "=" in part:
-            key, value = part.split("=", 1)
-            elements[key] = value
 
-    timestamp_str = elements.get("t")
-    signature = elements.get("v1")
+def verify_stripe_signature_raw(
+    payload: bytes,
+    signature_header: str,
+    secret: bytes | str,
+    tolerance_seconds: int = DEFAULT_TOLERANCE_SECONDS,
+) -> bytes:
+    """
+    Verify a Stripe webhook signature without parsing the body.
+
+    For callers that validate the body themselves, e.g. with
+    Model.model_validate_json(), skipping the intermediate dict.
+
+    Returns:
+        The verified payload, unchanged
+
+    Raises:
+        WebhookVerificationError: If verification fails
+    """
+    if len(signature_header) > _MAX_STRIPE_HEADER_LENGTH:
+        raise WebhookVerificationError("Signature header too large")
 
-    if not timestamp_str or not signature:
+    timestamp_str, signatures = _parse_stripe_header(signature_header)
+
+    if not timestamp_str or not signatures:
         raise WebhookVerificationError(
             "Invalid Stripe signature header format"
         )
@@ -127,33 +245,27 @@ def verify_stripe_signature(
     except ValueError:
         raise WebhookVerificationError("Invalid timestamp in signature header")
 
-    # Verify the signature
-    signed_payload = f"{timestamp}.".encode() + payload
-    expected_signature = hmac.new(
-        secret.encode("utf-8"),
-        signed_payload,
-        hashlib.sha256,
-    ).hexdigest()
-
-    if not hmac.compare_digest(signature, expected_signature):
-        raise WebhookVerificationError("Invalid Stripe webhook signature")
-
-    # Check timestamp
+    # Check timestamp first, so replays are rejected without hashing the payload
     current_time = int(time.time())
     if abs(current_time - timestamp) > tolerance_seconds:
         raise WebhookVerificationError("Stripe webhook timestamp outside tolerance")
 
-    # Parse and return payload
-    try:
-        return json.loads(payload.decode("utf-8"))
-    except json.JSONDecodeError as e:
-        raise WebhookVerificationError(f"Invalid JSON payload: {e}")
+    # Verify the signature
+    expected_signature = _hmac_sha256(secret, f"{timestamp}.".encode(), payload)
+
+    # Accept any v1, so events signed with either secret pass during rotation.
+    # Every candidate is compared, in constant time, without short-circuiting.
+    matches = [_signature_matches(signature, expected_signature) for signature in signatures]
+    if not any(matches):
+        raise WebhookVerificationError("Invalid Stripe webhook signature")
+
+    return payload
 
 
 def verify_lemonsqueezy_signature(
     payload: bytes,
     signature_header: str,
-    secret: str,
+    secret: bytes | str,
 ) -> dict[str, Any]:
     """
     Verify a LemonSqueezy webhook signature.
@@ -163,7 +275,7 @@ def verify_lemonsqueezy_signature(
     Args:
         payload: Raw request body
         signature_header: X-Signature header value
-        secret: Webhook signing secret
+        secret: Webhook signing secret, str or UTF-8 bytes
 
     Returns:
         Parsed webhook payload as dict
@@ -171,22 +283,39 @@ def verify_lemonsqueezy_signature(
     Raises:
         WebhookVerificationError: If verification fails
     """
-    import json
+    return _parse_payload(verify_lemonsqueezy_signature_raw(payload, signature_header, secret))
+
+
+def verify_lemonsqueezy_signature_raw(
+    payload: bytes,
+    signature_header: str,
+    secret: bytes | str,
+) -> bytes:
+    """
+    Verify a LemonSqueezy webhook signature without parsing the body.
+
+    Returns:
+        The verified payload, unchanged
+
+    Raises:
+        WebhookVerificationError: If verification fails
+    """
+    if len(signature_header) > _MAX_SIGNATURE_LENGTH:
+        raise WebhookVerificationError("Signature header too large")
 
     # LemonSqueezy uses HMAC-SHA256 with hex encoding
-    expected_signature = hmac.new(
-        secret.encode("utf-8"),
-        payload,
-        hashlib.sha256,
-    ).hexdigest()
+    expected_signature = _hmac_sha256(secret, payload)
 
-    if not hmac.compare_digest(signature_header, expected_signature):
+    if not _signature_matches(signature_header, expected_signature):
         raise WebhookVerificationError("Invalid LemonSqueezy webhook signature")
 
-    try:
-        return json.loads(payload.decode("utf-8"))
-    except json.JSONDecodeError as e:
-        raise WebhookVerificationError(f"Invalid JSON payload: {e}")
+    return payload
+
+
+def _verify_generic_signature_raw(payload: bytes, signature: str, secret: bytes | str) -> bytes:
+    """Verify an untimestamped generic webhook and return its payload."""
+    verify_webhook_signature(payload, signature, secret)
+    return payload
 
 
 class WebhookHandler:
@@ -209,20 +338,43 @@ class WebhookHandler:
                 # Process webhook...
             except WebhookVerificationError as e:
                 return Response(status_code=e.status_code, content=e.message)
+
+    With verification_cache_size > 0, an exact redelivery (same provider,
+    signature and body) within VERIFICATION_CACHE_TTL_SECONDS skips the
+    HMAC. Stripe entries never outlive the event's
+    timestamp tolerance, so the cache cannot extend the replay window.
     """
 
+    # provider -> verify-only function; every provider with a secret has an entry
+    _VERIFIERS: dict[str, Callable[[bytes, str, bytes], bytes]] = {
+        "stripe": verify_stripe_signature_raw,
+        "lemonsqueezy": verify_lemonsqueezy_signature_raw,
+        "generic": _verify_generic_signature_raw,
+    }
+
     def __init__(
         self,
         stripe_secret: str | None = None,
         lemonsqueezy_secret: str | None = None,
         generic_secret: str | None = None,
+        verification_cache_size: int = 0,
     ):
+        # Held UTF-8 encoded, ready to key the HMAC
         self.secrets = {
-            "stripe": stripe_secret or os.getenv("STRIPE_WEBHOOK_SECRET", ""),
-            "lemonsqueezy": lemonsqueezy_secret or os.getenv("LEMONSQUEEZY_WEBHOOK_SECRET", ""),
-            "generic": generic_secret or os.getenv("WEBHOOK_SECRET", ""),
+            "stripe": (stripe_secret or os.getenv("STRIPE_WEBHOOK_SECRET", "")).encode("utf-8"),
+            "lemonsqueezy": (
+                lemonsqueezy_secret or os.getenv("LEMONSQUEEZY_WEBHOOK_SECRET", "")
+            ).encode("utf-8"),
+            "generic": (generic_secret or os.getenv("WEBHOOK_SECRET", "")).encode("utf-8"),
         }
 
+        # Salted BLAKE2b-128 of (provider, signature, body) -> trusted-until timestamp, LRU order.
+        # The per-process salt keeps keys unpredictable, so entries can't be pre-computed.
+        self.verification_cache_size = verification_cache_size
+        self._verified: OrderedDict[bytes, float] = OrderedDict()
+        self._verified_lock = threading.Lock()
+        self._cache_salt = os.urandom(16)
+
     def verify_and_parse(
         self,
         payload: bytes,
@@ -240,6 +392,26 @@ class WebhookHandler:
         Returns:
             Parsed webhook payload
 
+        Raises:
+            WebhookVerificationError: If verification fails
+        """
+        return _parse_payload(self.verify_raw(payload, signature, provider))
+
+    def verify_raw(
+        self,
+        payload: bytes,
+        signature: str,
+        provider: str = "generic",
+    ) -> bytes:
+        """
+        Verify a webhook payload and return it unparsed.
+
+        Lets handlers validate straight from bytes, e.g.
+        StripeEvent.model_validate_json(handler.verify_raw(...)).
+
+        Returns:
+            The verified payload, unchanged
+
         Raises:
             WebhookVerificationError: If verification fails
         """
@@ -249,13 +421,35 @@ class WebhookHandler:
                 f"No secret configured for provider: {provider}"
             )
 
+        if not self.verification_cache_size:
+            return self._VERIFIERS[provider](payload, signature, secret)
+
+        key = self._verification_key(provider, signature, payload)
+        now = time.time()
+        with self._verified_lock:
+            deadline = self._verified.get(key)
+            if deadline is not None:
+                if deadline > now:
+                    self._verified.move_to_end(key)
+                    return payload
+                del self._verified[key]
+
+        self._VERIFIERS[provider](payload, signature, secret)
+
+        deadline = now + VERIFICATION_CACHE_TTL_SECONDS
         if provider == "stripe":
-            return verify_stripe_signature(payload, signature, secret)
-        elif provider == "lemonsqueezy":
-            return verify_lemonsqueezy_signature(payload, signature, secret)
-        else:
-            # Generic verification
-            import json
-
-            verify_webhook_signature(payload, signature, secret)
-            return json.loads(payload.decode("utf-8"))
+            # Verified above, so the timestamp parses
+            timestamp = int(_parse_stripe_header(signature)[0])
+            deadline = min(deadline, timestamp + DEFAULT_TOLERANCE_SECONDS)
+        with self._verified_lock:
+            self._verified[key] = deadline
+            if len(self._verified) > self.verification_cache_size:
+                self._verified.popitem(last=False)
+        return payload
+
+    def _verification_key(self, provider: str, signature: str, payload: bytes) -> bytes:
+        """Salted 128-bit digest identifying one delivery."""
+        digest = hashlib.blake2b(key=self._cache_salt, digest_size=16)
+        digest.update(f"{provider}\0{signature}\0".encode("utf-8"))
+        digest.update(payload)
+        return digest.digest()
@@ -125,6 +125,7 @@ class OracleConnector:
         self,
         sql: str,
         params: dict[str, Any] | None = None,
+        arraysize: int | None = None,
     ) -> list[dict[str, Any]]:
         """
         Execute a read-only SQL query.
@@ -132,6 +133,9 @@ class OracleConnector:
         Args:
             sql: The SQL query to execute (must be SELECT)
             params: Optional query parameters
+            arraysize: Rows fetched per round trip (driver default 100). Raise it
+                for large result sets; prefetching is sized one row past it so
+                the end of data arrives without an extra round trip.
 
         Returns:
             List of rows as dictionaries
@@ -147,6 +151,9 @@ class OracleConnector:
 
         async with self._pool.acquire() as conn:
             async with conn.cursor() as cursor:
+                if arraysize is not None:
+                    cursor.arraysize = arraysize
+                    cursor.prefetchrows = arraysize + 1
                 await cursor.execute(sql, params or {})
                 columns = [col[0] for col in cursor.description]
                 rows = await cursor.fetchall()
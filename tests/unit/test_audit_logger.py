@@ -0,0 +1,305 @@
+"""Unit tests for the append-only audit logger."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from atlas.api.security.audit import AuditEvent, AuditEventType, AuditLogger
+
+
+def _fail_first_write(audit: AuditLogger, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Make the logger's first batch write raise OSError, as on a full disk."""
+    write = audit._write_events
+    calls = 0
+
+    def flaky_write(events: list[AuditEvent]) -> None:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise OSError("disk full")
+        write(events)
+
+    monkeypatch.setattr(audit, "_write_events", flaky_write)
+
+
+class TestAuditQuery:
+    """Tests for AuditLogger.query filtering and pagination."""
+
+    @pytest.fixture
+    def audit(self, tmp_path: Path) -> AuditLogger:
+        """Create an AuditLogger writing to a temporary directory."""
+        return AuditLogger(log_dir=str(tmp_path))
+
+    def test_returns_newest_first(self, audit: AuditLogger) -> None:
+        """Events should come back in reverse chronological order."""
+        first = audit.log(AuditEventType.LOGIN_SUCCESS, user_id="user_001")
+        second = audit.log(AuditEventType.LOGOUT, user_id="user_001")
+
+        events = audit.query()
+        assert [e.id for e in events] == [second.id, first.id]
+
+    def test_filters_by_event_type_and_user(self, audit: AuditLogger) -> None:
+        """Only events matching every filter should be returned."""
+        audit.log(AuditEventType.LOGIN_SUCCESS, user_id="user_001")
+        audit.log(AuditEventType.LOGIN_FAILURE, user_id="user_001")
+        audit.log(AuditEventType.LOGIN_FAILURE, user_id="user_002")
+
+        events = audit.query(event_type=AuditEventType.LOGIN_FAILURE, user_id="user_002")
+        assert len(events) == 1
+        assert events[0].user_id == "user_002"
+
+    def test_cursor_pagination_visits_every_event_once(self, audit: AuditLogger) -> None:
+        """Walking pages by keyset cursor should neither skip nor repeat events."""
+        logged = [audit.log(AuditEventType.QUERY_EXECUTED, user_id="user_001") for _ in range(7)]
+
+        seen: list[str] = []
+        cursor_ts = cursor_id = None
+        while True:
+            page = audit.query(limit=3, cursor_ts=cursor_ts, cursor_id=cursor_id)
+            if not page:
+                break
+            seen.extend(e.id for e in page)
+            cursor_ts, cursor_id = page[-1].timestamp, page[-1].id
+
+        assert seen == [e.id for e in reversed(logged)]
+
+    def test_date_range_spans_daily_files(self, audit: AuditLogger, tmp_path: Path) -> None:
+        """Date filters should skip out-of-range files and stop at start_date."""
+        now = datetime.now(timezone.utc)
+        recent = audit.log(AuditEventType.LOGIN_SUCCESS, user_id="user_001")
+        older = recent.model_copy(update={"id": "evt_old", "timestamp": now - timedelta(days=3)})
+        day = (now - timedelta(days=3)).strftime("%Y-%m-%d")
+        (tmp_path / f"audit_{day}.jsonl").write_text(older.model_dump_json() + "\n")
+
+        assert [e.id for e in audit.query()] == [recent.id, "evt_old"]
+        assert [e.id for e in audit.query(start_date=now - timedelta(days=1))] == [recent.id]
+        assert [e.id for e in audit.query(end_date=now - timedelta(days=2))] == ["evt_old"]
+        assert audit.count(end_date=now - timedelta(days=2)) == 1
+
+    def test_count_ignores_pagination(self, audit: AuditLogger) -> None:
+        """count() should report every matching event, not a page."""
+        for _ in range(5):
+            audit.log(AuditEventType.QUERY_EXECUTED, user_id="user_001")
+        audit.log(AuditEventType.LOGOUT, user_id="user_001")
+
+        assert audit.count() == 6
+        assert audit.count(event_type=AuditEventType.QUERY_EXECUTED) == 5
+        assert audit.count(user_id="user_002") == 0
+
+
+class TestAuditStats:
+    """Tests for the rollup-backed AuditLogger.stats."""
+
+    def test_counts_new_events_incrementally(self, tmp_path: Path) -> None:
+        """Stats should reflect events appended after a previous refresh."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        since = datetime.now(timezone.utc) - timedelta(hours=24)
+        audit.log(AuditEventType.LOGIN_SUCCESS, user_id="user_001")
+        audit.log(AuditEventType.LOGIN_FAILURE, user_email="demo@atlas.sa")
+
+        assert audit.stats(since).total_events == 2
+
+        audit.log(AuditEventType.LOGIN_FAILURE, user_email="demo@atlas.sa")
+        stats = audit.stats(since)
+
+        assert stats.total_events == 3
+        assert stats.events_by_type == {"auth.login.success": 1, "auth.login.failure": 2}
+        assert stats.events_since == 3
+        assert stats.failed_logins_since == 2
+
+    def test_estimates_distinct_users_and_ips_today(self, tmp_path: Path) -> None:
+        """Distinct counts should be close to exact for today's events."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        for i in range(1000):
+            audit.log(
+                AuditEventType.QUERY_EXECUTED,
+                user_id=f"user_{i % 300:03d}",
+                client_ip=f"10.0.{i % 50}.1",
+            )
+
+        stats = audit.stats(datetime.now(timezone.utc) - timedelta(hours=24))
+        assert abs(stats.unique_users_today - 300) <= 15
+        assert abs(stats.unique_ips_today - 50) <= 3
+
+
+class TestAuditGetById:
+    """Tests for AuditLogger.get_by_id point lookups."""
+
+    def test_finds_logged_event(self, tmp_path: Path) -> None:
+        """A logged event should be retrievable by its ID."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        audit.log(AuditEventType.LOGIN_SUCCESS, user_id="user_001")
+        target = audit.log(AuditEventType.LOGOUT, user_id="user_002")
+
+        found = audit.get_by_id(target.id)
+        assert found is not None
+        assert found.user_id == "user_002"
+
+    def test_unknown_ids_return_none(self, tmp_path: Path) -> None:
+        """Unknown or malformed IDs should not raise."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        audit.log(AuditEventType.LOGIN_SUCCESS, user_id="user_001")
+
+        assert audit.get_by_id("evt_20000101000000_000001") is None
+        assert audit.get_by_id("not-an-event") is None
+
+    def test_event_ids_are_unique_and_time_sorted(self, tmp_path: Path) -> None:
+        """IDs issued in sequence should be distinct and sort in issue order."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        ids = [audit.log(AuditEventType.QUERY_EXECUTED).id for _ in range(50)]
+
+        assert len(set(ids)) == len(ids)
+        assert ids == sorted(ids)
+
+
+class TestAuditCompression:
+    """Tests for archiving closed days as gzip."""
+
+    def test_archived_days_stay_queryable(self, tmp_path: Path) -> None:
+        """Compressed days should still be found by query, get_by_id and stats."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        today = audit.log(AuditEventType.LOGIN_SUCCESS, user_id="user_001")
+        old = today.model_copy(
+            update={
+                "id": "evt_20200101000000_000001",
+                "timestamp": datetime(2020, 1, 1, tzinfo=timezone.utc),
+            }
+        )
+        (tmp_path / "audit_2020-01-01.jsonl").write_text(old.model_dump_json() + "\n")
+        since = datetime(2019, 1, 1, tzinfo=timezone.utc)
+        assert audit.stats(since).total_events == 2
+
+        assert audit.compress_rotated_logs() == 1
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "audit_2020-01-01.jsonl.gz",
+            today.timestamp.strftime("audit_%Y-%m-%d.jsonl"),
+        ]
+        assert [e.id for e in audit.query()] == [today.id, old.id]
+        assert audit.get_by_id(old.id) is not None
+        assert audit.stats(since).total_events == 2
+
+
+class TestAuditBuffering:
+    """Tests for buffered writes after AuditLogger.start()."""
+
+    async def test_buffers_until_flush(self, tmp_path: Path) -> None:
+        """Routine events should be held in memory until flushed."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        await audit.start()
+        try:
+            audit.log(AuditEventType.QUERY_EXECUTED, user_id="user_001")
+            assert audit.query() == []
+
+            audit.flush()
+            assert len(audit.query()) == 1
+        finally:
+            await audit.stop()
+
+    async def test_security_events_are_written_immediately(self, tmp_path: Path) -> None:
+        """Security events should flush the buffer and themselves, in order."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        await audit.start()
+        try:
+            queued = audit.log(AuditEventType.QUERY_EXECUTED, user_id="user_001")
+            failure = audit.log(AuditEventType.LOGIN_FAILURE, user_email="demo@atlas.sa")
+
+            assert [e.id for e in audit.query()] == [failure.id, queued.id]
+        finally:
+            await audit.stop()
+
+    async def test_stop_writes_pending_events(self, tmp_path: Path) -> None:
+        """Stopping the logger should not drop buffered events."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        await audit.start()
+        audit.log(AuditEventType.LOGOUT, user_id="user_001")
+        await audit.stop()
+
+        assert len(audit.query()) == 1
+
+    async def test_failed_flush_keeps_events_for_next_flush(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A write error should put the batch back so the next flush writes it."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        _fail_first_write(audit, monkeypatch)
+        await audit.start()
+        try:
+            first = audit.log(AuditEventType.LOGOUT, user_id="user_001")
+            with pytest.raises(OSError):
+                audit.flush()
+            second = audit.log(AuditEventType.LOGOUT, user_id="user_002")
+
+            audit.flush()
+            assert [e.id for e in audit.query()] == [second.id, first.id]
+            assert audit.dropped_events == 0
+        finally:
+            await audit.stop()
+
+    async def test_periodic_flush_survives_write_error(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The background flusher should log a failed write and keep running."""
+        monkeypatch.setattr(AuditLogger, "FLUSH_INTERVAL_SECONDS", 0.01)
+        audit = AuditLogger(log_dir=str(tmp_path))
+        _fail_first_write(audit, monkeypatch)
+        await audit.start()
+        try:
+            audit.log(AuditEventType.LOGOUT, user_id="user_001")
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if audit.query():
+                    break
+
+            assert len(audit.query()) == 1
+            assert not audit._flusher.done()
+        finally:
+            await audit.stop()
+
+    async def test_unserializable_event_does_not_drop_batch(self, tmp_path: Path) -> None:
+        """An event that cannot be serialized should be counted and skipped alone."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        cyclic: list = []
+        cyclic.append(cyclic)
+        await audit.start()
+        try:
+            audit.log(AuditEventType.LOGOUT, details={"items": cyclic})
+            kept = audit.log(AuditEventType.LOGOUT, user_id="user_001")
+            audit.flush()
+
+            assert [e.id for e in audit.query()] == [kept.id]
+            assert audit.dropped_events == 1
+        finally:
+            await audit.stop()
+
+
+class TestSanitizeDetails:
+    """Tests for redaction of sensitive audit details."""
+
+    def test_redacts_sensitive_keys_at_any_depth(self, tmp_path: Path) -> None:
+        """Sensitive keys should be redacted, including in nested dicts."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        event = audit.log(
+            AuditEventType.SETTINGS_CHANGED,
+            details={
+                "new_Password": "hunter2",
+                "ApiKey": "abc",
+                "nested": {"refresh_token": "xyz", "page": 2},
+                "page": 1,
+            },
+        )
+
+        assert event.details == {
+            "new_Password": "[REDACTED]",
+            "ApiKey": "[REDACTED]",
+            "nested": {"refresh_token": "[REDACTED]", "page": 2},
+            "page": 1,
+        }
+
+    def test_truncates_long_strings(self, tmp_path: Path) -> None:
+        """Very long string values should be truncated."""
+        audit = AuditLogger(log_dir=str(tmp_path))
+        event = audit.log(AuditEventType.QUERY_EXECUTED, details={"question": "x" * 1500})
+
+        assert event.details["question"] == "x" * 1000 + "...[truncated]"
@@ -0,0 +1,93 @@
+"""Unit tests for the audit log API routes."""
+
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from atlas.api.routes import audit as audit_routes
+from atlas.api.security.audit import AuditEvent, AuditEventType, AuditLogger
+from atlas.api.security.auth import create_access_token
+from atlas.api.security.models import UserRole
+
+
+@pytest.fixture
+def audit(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> AuditLogger:
+    """Route the audit endpoints to a logger writing to a temporary directory."""
+    logger = AuditLogger(log_dir=str(tmp_path))
+    monkeypatch.setattr(audit_routes, "get_audit_logger", lambda: logger)
+    return logger
+
+
+@pytest.fixture
+def client() -> TestClient:
+    """Create a client for an app serving only the audit routes."""
+    app = FastAPI()
+    app.include_router(audit_routes.router)
+    token, _ = create_access_token("admin_001", "admin@atlas.sa", UserRole.ADMIN)
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+class TestGetAuditLogs:
+    """Tests for GET /api/audit/logs."""
+
+    def test_naive_end_date_is_read_as_utc(self, audit: AuditLogger, client: TestClient) -> None:
+        """A naive end_date should match stored UTC events, not filter them all out."""
+        audit.log(AuditEventType.LOGOUT, user_id="user_001")
+
+        response = client.get("/api/audit/logs", params={"end_date": "2100-01-01T00:00:00"})
+
+        assert response.status_code == 200
+        assert len(response.json()["events"]) == 1
+
+    def test_naive_end_date_with_cursor(self, audit: AuditLogger, client: TestClient) -> None:
+        """A naive end_date combined with a cursor should page, not fail."""
+        for _ in range(3):
+            audit.log(AuditEventType.LOGOUT, user_id="user_001")
+        params = {"end_date": "2100-01-01T00:00:00", "page_size": 2}
+
+        first = client.get("/api/audit/logs", params=params).json()
+        response = client.get("/api/audit/logs", params={**params, "cursor": first["next_cursor"]})
+
+        assert response.status_code == 200
+        assert len(response.json()["events"]) == 1
+
+
+class TestGetAuditEvent:
+    """Tests for GET /api/audit/events/{event_id}."""
+
+    @staticmethod
+    def _analyst_headers() -> dict[str, str]:
+        """Authorization headers for a non-admin user."""
+        token, _ = create_access_token("user_001", "demo@atlas.sa", UserRole.ANALYST)
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_owner_can_view_own_event(self, audit: AuditLogger, client: TestClient) -> None:
+        """A non-admin should be able to read an event they own."""
+        event = audit.log(AuditEventType.LOGOUT, user_id="user_001")
+
+        response = client.get(f"/api/audit/events/{event.id}", headers=self._analyst_headers())
+
+        assert response.status_code == 200
+        assert response.json()["id"] == event.id
+
+    def test_other_users_event_is_forbidden_before_parsing(
+        self, audit: AuditLogger, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A non-admin should get 403 for another user's event without it being validated."""
+        event = audit.log(AuditEventType.LOGOUT, user_id="user_002")
+
+        def fail_validate(*args: object, **kwargs: object) -> None:
+            raise AssertionError("event was parsed before the ownership check")
+
+        monkeypatch.setattr(AuditEvent, "model_validate", fail_validate)
+        response = client.get(f"/api/audit/events/{event.id}", headers=self._analyst_headers())
+
+        assert response.status_code == 403
+
+    def test_admin_can_view_any_event(self, audit: AuditLogger, client: TestClient) -> None:
+        """Admins should be able to read events owned by anyone."""
+        event = audit.log(AuditEventType.LOGOUT, user_id="user_002")
+
+        assert client.get(f"/api/audit/events/{event.id}").status_code == 200
@@ -0,0 +1,134 @@
+"""Unit tests for JWT issuing and verification."""
+
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from atlas.api.security import auth
+from atlas.api.security.auth import (
+    create_access_token,
+    invalidate_cached_token,
+    verify_token,
+)
+from atlas.api.security.models import UserRole
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache() -> None:
+    """Start every test with an empty verification cache."""
+    auth._token_cache.clear()
+
+
+class TestVerifyTokenCache:
+    """Tests for the verify_token result cache."""
+
+    def test_repeat_verification_is_served_from_cache(self) -> None:
+        """Verifying the same token twice should return the cached payload."""
+        token, _ = create_access_token("user_001", "demo@atlas.sa", UserRole.ANALYST)
+
+        first = verify_token(token)
+        assert verify_token(token) is first
+        assert len(auth._token_cache) == 1
+
+    def test_cache_holds_digests_not_tokens(self) -> None:
+        """Cache keys should be 16-byte digests rather than raw tokens."""
+        token, _ = create_access_token("user_001", "demo@atlas.sa", UserRole.ANALYST)
+        verify_token(token)
+
+        assert all(len(key) == 16 and key != token.encode() for key in auth._token_cache)
+
+    def test_invalidate_drops_entry(self) -> None:
+        """Invalidating a token ID should force the next call to re-verify."""
+        token, _ = create_access_token("user_001", "demo@atlas.sa", UserRole.ANALYST)
+        first = verify_token(token)
+
+        invalidate_cached_token(first.jti)
+
+        assert not auth._token_cache
+        assert verify_token(token) is not first
+
+    def test_expired_tokens_are_rejected_and_not_cached(self) -> None:
+        """Expired tokens should fail verification and leave no cache entry."""
+        token, _ = create_access_token(
+            "user_001",
+            "demo@atlas.sa",
+            UserRole.ANALYST,
+            expires_delta=timedelta(seconds=-1),
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            verify_token(token)
+        assert exc_info.value.status_code == 401
+        assert not auth._token_cache
+
+
+class TestHS256Interop:
+    """Tests that the hand-rolled HS256 path matches PyJWT."""
+
+    def test_issued_tokens_decode_with_pyjwt(self) -> None:
+        """Tokens we issue should be valid standard JWTs."""
+        token, expires_at = create_access_token("user_001", "demo@atlas.sa", UserRole.ANALYST)
+
+        claims = jwt.decode(token, auth.JWT_SECRET_KEY, algorithms=["HS256"])
+        assert jwt.get_unverified_header(token) == {"alg": "HS256", "typ": "JWT"}
+        assert claims["sub"] == "user_001"
+        assert claims["exp"] == int(expires_at.timestamp())
+
+    def test_pyjwt_tokens_are_accepted(self) -> None:
+        """Tokens signed by PyJWT with our key should verify."""
+        now = datetime.now(timezone.utc)
+        token = jwt.encode(
+            {
+                "sub": "user_001",
+                "email": "demo@atlas.sa",
+                "role": "analyst",
+                "exp": now + timedelta(minutes=5),
+                "iat": now,
+                "jti": "abc",
+            },
+            auth.JWT_SECRET_KEY,
+            algorithm="HS256",
+        )
+
+        assert verify_token(token).jti == "abc"
+
+    def test_tampered_tokens_are_rejected(self) -> None:
+        """Changing the payload or dropping the algorithm must fail verification."""
+        token, _ = create_access_token("user_001", "demo@atlas.sa", UserRole.ANALYST)
+        header, payload, signature = token.split(".")
+        forged_payload = jwt.utils.base64url_encode(
+            jwt.utils.base64url_decode(payload).replace(b"analyst", b"admin")
+        ).decode()
+        unsigned = jwt.encode(
+            jwt.decode(token, options={"verify_signature": False}), None, algorithm="none"
+        )
+
+        for bad in (f"{header}.{forged_payload}.{signature}", unsigned, f"{header}.{payload}."):
+            with pytest.raises(HTTPException) as exc_info:
+                verify_token(bad)
+            assert exc_info.value.status_code == 401
+
+
+class TestBcryptRounds:
+    """Tests for reading the bcrypt work factor from the environment."""
+
+    def test_default_is_twelve(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Without configuration the work factor should be 12."""
+        monkeypatch.delenv("ATLAS_BCRYPT_ROUNDS", raising=False)
+        assert auth._bcrypt_rounds_from_env() == 12
+
+    @pytest.mark.parametrize("value", ["4", "9", "32", "twelve"])
+    def test_bad_values_are_rejected(self, value: str, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Weak, out-of-range or non-integer values should fail with a clear message."""
+        monkeypatch.setenv("ATLAS_BCRYPT_ROUNDS", value)
+        monkeypatch.delenv("ATLAS_ALLOW_WEAK_BCRYPT", raising=False)
+        with pytest.raises(ValueError, match="ATLAS_BCRYPT_ROUNDS"):
+            auth._bcrypt_rounds_from_env()
+
+    def test_weak_rounds_need_explicit_opt_in(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Rounds below the minimum should be allowed only with the test flag."""
+        monkeypatch.setenv("ATLAS_BCRYPT_ROUNDS", "4")
+        monkeypatch.setenv("ATLAS_ALLOW_WEAK_BCRYPT", "true")
+        assert auth._bcrypt_rounds_from_env() == 4
@@ -0,0 +1,53 @@
+"""Unit tests for the authentication API routes."""
+
+import asyncio
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from fastapi import HTTPException, Request
+
+from atlas.api.routes import auth as auth_routes
+from atlas.api.security.audit import AuditLogger
+from atlas.api.security.auth import _mock_users
+from atlas.api.security.models import RegisterRequest
+
+EMAIL = "race@atlas.sa"
+
+
+@pytest.fixture(autouse=True)
+def audit(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[AuditLogger]:
+    """Route auth audit events to a temporary directory and drop test users."""
+    logger = AuditLogger(log_dir=str(tmp_path))
+    monkeypatch.setattr(auth_routes, "get_audit_logger", lambda: logger)
+    yield logger
+    _mock_users.pop(EMAIL, None)
+
+
+def _register_request(password: str) -> RegisterRequest:
+    """Build a registration for the shared test email."""
+    return RegisterRequest(
+        email=EMAIL,
+        password=password,
+        confirm_password=password,
+        full_name="Race Test",
+    )
+
+
+class TestRegister:
+    """Tests for POST /api/auth/register."""
+
+    async def test_concurrent_registrations_cannot_replace_account(self) -> None:
+        """Only one of two simultaneous registrations for an email should succeed."""
+        request = Request({"type": "http", "headers": [], "client": ("127.0.0.1", 0)})
+
+        results = await asyncio.gather(
+            auth_routes.register(request, _register_request("Secure123")),
+            auth_routes.register(request, _register_request("Other4567")),
+            return_exceptions=True,
+        )
+
+        (created,) = [r for r in results if not isinstance(r, BaseException)]
+        (conflict,) = [r for r in results if isinstance(r, HTTPException)]
+        assert conflict.status_code == 409
+        assert _mock_users[EMAIL].profile.id == created.user.id
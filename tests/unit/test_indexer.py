@@ -0,0 +1,84 @@
+"""Unit tests for the Oracle schema indexer."""
+
+import shelve
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from atlas.connectors.oracle.indexer import OracleSchemaIndexer
+
+
+class _StubEmbedder:
+    """Stand-in for SentenceTransformer that records what it encodes."""
+
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+
+    def encode(self, documents: list[str], **kwargs: Any) -> np.ndarray:
+        """Return a distinct vector per document, derived from its length."""
+        self.encoded.extend(documents)
+        return np.array(
+            [
+                np.full(OracleSchemaIndexer.EMBEDDING_DIM, len(doc), dtype=np.float64)
+                for doc in documents
+            ]
+        )
+
+
+class TestEmbedDocuments:
+    """Tests for the persistent document embedding cache."""
+
+    @pytest.fixture
+    def indexer(self, tmp_path: Path) -> Iterator[OracleSchemaIndexer]:
+        """Create an indexer with a stub embedder, skipping Oracle and Qdrant."""
+        indexer = OracleSchemaIndexer.__new__(OracleSchemaIndexer)
+        indexer._embedder = _StubEmbedder()
+        indexer._embedding_backend = "torch"
+        indexer._embedding_cache = shelve.open(str(tmp_path / "embedding_cache"))
+        indexer._embedding_cache_lock = threading.Lock()
+        indexer._qdrant = MagicMock()
+        yield indexer
+        indexer._embedding_cache.close()
+
+    def test_cached_documents_are_not_re_encoded(self, indexer: OracleSchemaIndexer) -> None:
+        """Only documents missing from the cache should reach the embedder."""
+        first = indexer._embed_documents(["Table: A", "Table: BB"])
+        second = indexer._embed_documents(["Table: BB", "Table: CCC"])
+
+        assert indexer._embedder.encoded == ["Table: A", "Table: BB", "Table: CCC"]
+        assert second.shape == (2, OracleSchemaIndexer.EMBEDDING_DIM)
+        assert second.dtype == np.float32
+        np.testing.assert_array_equal(second[0], first[1])
+        assert second[1][0] == len("Table: CCC")
+
+    def test_cache_is_keyed_by_backend(self, indexer: OracleSchemaIndexer) -> None:
+        """A different embedding backend should not reuse cached vectors."""
+        indexer._embed_documents(["Table: A"])
+        indexer._embedding_backend = "onnx-int8"
+        indexer._embed_documents(["Table: A"])
+
+        assert indexer._embedder.encoded == ["Table: A", "Table: A"]
+
+    def test_concurrent_calls_share_the_cache(self, indexer: OracleSchemaIndexer) -> None:
+        """Worker threads embedding at once should all read and fill the cache safely."""
+        batches = [[f"Table: T{n}_{i}" for i in range(20)] for n in range(8)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(indexer._embed_documents, batches))
+
+        assert all(result.shape == (20, OracleSchemaIndexer.EMBEDDING_DIM) for result in results)
+        assert len(indexer._embedding_cache) == 160
+
+    def test_close_persists_cache(self, indexer: OracleSchemaIndexer, tmp_path: Path) -> None:
+        """Closing the indexer should flush the cache so a new instance reuses it."""
+        indexer._embed_documents(["Table: A"])
+        indexer.close()
+
+        with shelve.open(str(tmp_path / "embedding_cache")) as reopened:
+            assert len(reopened) == 1
+        indexer._qdrant.close.assert_called_once()
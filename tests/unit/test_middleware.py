@@ -0,0 +1,283 @@
+"""Unit tests for the security middleware stack."""
+
+import re
+from typing import Annotated, Any
+
+import orjson
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import HTMLResponse
+from fastapi.testclient import TestClient
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from atlas.api.security import middleware
+from atlas.api.security.auth import create_access_token, get_current_user
+from atlas.api.security.middleware import (
+    _RATE_LIMIT_WINDOW_NS,
+    _RATE_LIMITED_BODY,
+    RateLimitMiddleware,
+    RequestContext,
+    RequestContextMiddleware,
+    RequestLoggingMiddleware,
+)
+from atlas.api.security.models import TokenPayload, UserRole
+
+
+class _RecordingForwarder:
+    """Stand-in SIEM forwarder that keeps forwarded entries in memory."""
+
+    def __init__(self) -> None:
+        self.entries: list[dict[str, Any]] = []
+
+    def forward(self, entry: dict[str, Any]) -> None:
+        """Record the entry."""
+        self.entries.append(entry)
+
+
+class _Clock:
+    """Controllable replacement for time.monotonic_ns."""
+
+    def __init__(self) -> None:
+        self.now = 1_000_000_000_000
+
+    def __call__(self) -> int:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    """Freeze the middleware's monotonic clock under test control."""
+    fake = _Clock()
+    monkeypatch.setattr(middleware.time, "monotonic_ns", fake)
+    return fake
+
+
+@pytest.fixture
+def forwarder(monkeypatch: pytest.MonkeyPatch) -> _RecordingForwarder:
+    """Capture SIEM entries instead of writing them to disk."""
+    recorder = _RecordingForwarder()
+    monkeypatch.setattr(middleware, "get_siem_forwarder", lambda: recorder)
+    return recorder
+
+
+class TestRequestLoggingMiddleware:
+    """Tests for request logging and SIEM forwarding."""
+
+    @pytest.fixture
+    def client(self) -> TestClient:
+        """Create a client for an app with only the logging middleware."""
+        app = FastAPI()
+        app.add_middleware(RequestLoggingMiddleware)
+
+        @app.get("/ok")
+        async def ok() -> dict:
+            return {"ok": True}
+
+        @app.get("/boom")
+        async def boom() -> dict:
+            raise RuntimeError("boom")
+
+        return TestClient(app, raise_server_exceptions=False)
+
+    def test_forwards_request_entry(
+        self, client: TestClient, forwarder: _RecordingForwarder
+    ) -> None:
+        """A completed request should be forwarded with its status and path."""
+        response = client.get("/ok", headers={"User-Agent": "pytest"})
+
+        (entry,) = forwarder.entries
+        assert entry["status_code"] == 200
+        assert entry["path"] == "/ok"
+        assert entry["user_agent"] == "pytest"
+        assert entry["request_id"] == response.headers["x-request-id"]
+
+    def test_forwards_500_when_app_raises(
+        self, client: TestClient, forwarder: _RecordingForwarder
+    ) -> None:
+        """An unhandled exception should still be forwarded, as a 500."""
+        response = client.get("/boom")
+
+        assert response.status_code == 500
+        (entry,) = forwarder.entries
+        assert entry["status_code"] == 500
+        assert entry["path"] == "/boom"
+
+
+class TestRateLimitMiddleware:
+    """Tests for per-IP rate limiting."""
+
+    @pytest.fixture
+    def limiter(self, clock: _Clock) -> RateLimitMiddleware:
+        """Wrap a trivial app with small request limits."""
+        app = FastAPI()
+
+        @app.get("/api/data")
+        async def data() -> dict:
+            return {"ok": True}
+
+        @app.post("/api/auth/login")
+        async def login() -> dict:
+            return {"ok": True}
+
+        return RateLimitMiddleware(app, requests_per_minute=3, auth_requests_per_minute=1)
+
+    def test_over_limit_returns_preencoded_429(self, limiter: RateLimitMiddleware) -> None:
+        """The request past the limit should get the shared 429 body and headers."""
+        client = TestClient(limiter)
+        statuses = [client.get("/api/data").status_code for _ in range(4)]
+
+        assert statuses == [200, 200, 200, 429]
+        response = client.get("/api/data")
+        assert response.content == _RATE_LIMITED_BODY
+        assert orjson.loads(response.content)["detail"].startswith("Rate limit exceeded")
+        assert response.headers["retry-after"] == "60"
+        assert response.headers["content-type"] == "application/json"
+
+    def test_auth_endpoints_have_their_own_limit(self, limiter: RateLimitMiddleware) -> None:
+        """Auth paths should hit the stricter limit first."""
+        client = TestClient(limiter)
+
+        assert client.post("/api/auth/login").status_code == 200
+        assert client.post("/api/auth/login").status_code == 429
+        assert client.get("/api/data").status_code == 200
+
+    @pytest.mark.parametrize(
+        "limits",
+        [
+            {"requests_per_minute": 0},
+            {"auth_requests_per_minute": 0},
+            {"requests_per_minute": -1},
+        ],
+    )
+    def test_limits_below_one_are_rejected(self, limits: dict[str, int]) -> None:
+        """A zero limit would index the oldest request instead of blocking, so refuse it."""
+        with pytest.raises(ValueError, match="at least 1"):
+            RateLimitMiddleware(FastAPI(), **limits)
+
+    def test_limit_resets_after_window(self, limiter: RateLimitMiddleware, clock: _Clock) -> None:
+        """Requests older than the window should no longer count."""
+        client = TestClient(limiter)
+        for _ in range(3):
+            client.get("/api/data")
+        assert client.get("/api/data").status_code == 429
+
+        clock.now += _RATE_LIMIT_WINDOW_NS
+        assert client.get("/api/data").status_code == 200
+
+    def test_idle_ips_are_evicted(self, limiter: RateLimitMiddleware, clock: _Clock) -> None:
+        """The periodic sweep should drop IPs with no request in the window."""
+        client = TestClient(limiter)
+        client.get("/api/data", headers={"X-Forwarded-For": "10.0.0.1"})
+        clock.now += _RATE_LIMIT_WINDOW_NS // 2
+        client.get("/api/data", headers={"X-Forwarded-For": "10.0.0.2"})
+
+        clock.now += _RATE_LIMIT_WINDOW_NS // 2
+        client.get("/api/data", headers={"X-Forwarded-For": "10.0.0.3"})
+
+        assert set(limiter.request_counts) == {"10.0.0.2", "10.0.0.3"}
+
+
+class TestSecurityHeaders:
+    """Tests for security headers added by the logging middleware."""
+
+    @pytest.fixture
+    def client(self, forwarder: _RecordingForwarder) -> TestClient:
+        """Create a client for an app with security headers enabled."""
+        app = FastAPI()
+        app.add_middleware(RequestLoggingMiddleware, add_security_headers=True)
+
+        @app.get("/api/data")
+        async def data() -> dict:
+            return {"ok": True}
+
+        @app.get("/page")
+        async def page() -> HTMLResponse:
+            return HTMLResponse("<p>hi</p>", headers={"Cache-Control": "public"})
+
+        return TestClient(app)
+
+    def test_api_responses_are_not_cacheable(self, client: TestClient) -> None:
+        """API paths should get the common headers plus no-store caching."""
+        headers = client.get("/api/data").headers
+
+        assert headers["x-frame-options"] == "DENY"
+        assert headers["x-content-type-options"] == "nosniff"
+        assert headers["content-security-policy"] == "default-src 'none'; frame-ancestors 'none'"
+        assert headers["cache-control"] == "no-store, max-age=0"
+        assert headers["pragma"] == "no-cache"
+
+    def test_non_api_responses_keep_their_caching(self, client: TestClient) -> None:
+        """Other paths should get the common headers only."""
+        headers = client.get("/page").headers
+
+        assert headers["x-frame-options"] == "DENY"
+        assert headers["cache-control"] == "public"
+        assert "pragma" not in headers
+
+    def test_request_id_format(self, client: TestClient) -> None:
+        """Request IDs should be a 16-hex process prefix plus an 8-hex counter."""
+        first = client.get("/api/data").headers["x-request-id"]
+        second = client.get("/api/data").headers["x-request-id"]
+
+        assert re.fullmatch(r"[0-9a-f]{24}", first)
+        assert first[:16] == second[:16]
+        assert int(second[16:], 16) > int(first[16:], 16)
+
+
+class _FixedContextMiddleware:
+    """Store a preset RequestContext, as RequestContextMiddleware would."""
+
+    def __init__(self, app: ASGIApp, ctx: RequestContext):
+        self.app = app
+        self.ctx = ctx
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        scope.setdefault("state", {})["ctx"] = self.ctx
+        await self.app(scope, receive, send)
+
+
+class TestBearerFromRequestContext:
+    """Tests for reading the bearer token from the parsed request context."""
+
+    @staticmethod
+    def _app() -> FastAPI:
+        """An app with a route returning the authenticated user ID."""
+        app = FastAPI()
+
+        @app.get("/me")
+        async def me(user: Annotated[TokenPayload, Depends(get_current_user)]) -> dict:
+            return {"sub": user.sub}
+
+        return app
+
+    def test_token_is_read_from_context(self) -> None:
+        """The dependency should use the stored context, not re-read the header."""
+        token, _ = create_access_token("user_001", "demo@atlas.sa", UserRole.ANALYST)
+        app = self._app()
+        ctx = RequestContext(
+            request_id="r", client_ip="127.0.0.1", auth_scheme="Bearer", auth_token=token
+        )
+        app.add_middleware(_FixedContextMiddleware, ctx=ctx)
+
+        response = TestClient(app).get("/me", headers={"Authorization": "Bearer invalid"})
+
+        assert response.json() == {"sub": "user_001"}
+
+    def test_lowercase_scheme_is_accepted(self) -> None:
+        """The bearer scheme should match case-insensitively."""
+        token, _ = create_access_token("user_001", "demo@atlas.sa", UserRole.ANALYST)
+        app = self._app()
+        app.add_middleware(RequestContextMiddleware)
+
+        response = TestClient(app).get("/me", headers={"Authorization": f"bearer {token}"})
+
+        assert response.json() == {"sub": "user_001"}
+
+    def test_other_schemes_are_rejected(self) -> None:
+        """Non-bearer credentials should be treated as missing."""
+        app = self._app()
+        app.add_middleware(RequestContextMiddleware)
+
+        response = TestClient(app).get("/me", headers={"Authorization": "Basic dXNlcjpwYXNz"})
+
+        assert response.status_code == 401
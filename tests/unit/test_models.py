@@ -0,0 +1,107 @@
+"""Unit tests for API request validation models."""
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from atlas.api.security.models import (
+    AuthRequest,
+    RegisterRequest,
+    _normalize_email,
+    clean_question,
+    validate_input,
+)
+
+
+class TestPasswordStrength:
+    """Tests for the shared password policy."""
+
+    def test_strong_password_is_accepted(self) -> None:
+        """A password with upper, lower and digit characters should validate."""
+        request = AuthRequest(email="demo@atlas.sa", password="Secure123")
+        assert request.password.get_secret_value() == "Secure123"
+
+    @pytest.mark.parametrize(
+        ("password", "message"),
+        [
+            ("secure123", "uppercase"),
+            ("SECURE123", "lowercase"),
+            ("SecurePass", "digit"),
+        ],
+    )
+    def test_missing_character_class_is_rejected(self, password: str, message: str) -> None:
+        """Each missing character class should be reported by name."""
+        with pytest.raises(ValidationError, match=message):
+            AuthRequest(email="demo@atlas.sa", password=password)
+
+    def test_register_applies_same_policy(self) -> None:
+        """Registration should enforce the same rules as login."""
+        with pytest.raises(ValidationError, match="digit"):
+            RegisterRequest(
+                email="demo@atlas.sa",
+                password="SecurePass",
+                confirm_password="SecurePass",
+                full_name="Demo User",
+            )
+
+
+class TestEmailAddress:
+    """Tests for the cached email validator."""
+
+    def test_normalizes_like_email_str(self) -> None:
+        """The domain should be lowercased and surrounding whitespace stripped."""
+        request = AuthRequest(email=" Demo@Atlas.SA ", password="Secure123")
+        assert request.email == "Demo@atlas.sa"
+
+    def test_repeat_validation_is_cached(self) -> None:
+        """Validating the same address again should hit the cache."""
+        _normalize_email.cache_clear()
+        AuthRequest(email="demo@atlas.sa", password="Secure123")
+        AuthRequest(email="demo@atlas.sa", password="Secure123")
+        assert _normalize_email.cache_info().hits == 1
+
+    def test_invalid_address_is_rejected(self) -> None:
+        """Malformed addresses should still fail validation."""
+        with pytest.raises(ValidationError, match="email"):
+            AuthRequest(email="not-an-email", password="Secure123")
+
+
+class TestCleanQuestion:
+    """Tests for chat question sanitization."""
+
+    def test_strips_null_bytes_and_collapses_whitespace(self) -> None:
+        """Null bytes should vanish and whitespace runs become single spaces."""
+        assert clean_question("  show\x00 all\t\n customers  ") == "show all customers"
+
+    def test_too_short_after_cleanup_is_rejected(self) -> None:
+        """A question that shrinks below 3 characters should be rejected."""
+        with pytest.raises(ValueError, match="at least 3 characters"):
+            clean_question(" a\x00\x00 ")
+
+
+class TestValidateInput:
+    """Tests for the validate_input decorator."""
+
+    def test_only_annotated_parameter_is_validated(self) -> None:
+        """Only the parameter typed as the model should be coerced."""
+
+        @validate_input(AuthRequest)
+        async def handler(request: AuthRequest, extra: dict) -> tuple:
+            return request, extra
+
+        extra = {"email": "other@atlas.sa", "password": "Secure123"}
+        request, passed_extra = asyncio.run(
+            handler(request={"email": "demo@atlas.sa", "password": "Secure123"}, extra=extra)
+        )
+
+        assert isinstance(request, AuthRequest)
+        assert passed_extra is extra
+
+    def test_missing_model_parameter_is_rejected(self) -> None:
+        """Decorating a function without a model-typed parameter should fail early."""
+        with pytest.raises(TypeError, match="AuthRequest"):
+
+            @validate_input(AuthRequest)
+            async def handler(request: dict) -> dict:
+                return request
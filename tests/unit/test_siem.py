@@ -0,0 +1,99 @@
+"""Unit tests for SIEM request log forwarding."""
+
+import gzip
+import time
+from pathlib import Path
+from typing import Any
+
+import orjson
+import pytest
+
+from atlas.api.security.siem import SIEMForwarder
+
+
+def _read_entries(log_file: Path) -> list[dict[str, Any]]:
+    """Read the JSONL entries from a plain or gzipped log file."""
+    opener = gzip.open if log_file.suffix == ".gz" else open
+    with opener(log_file, "rb") as fh:
+        return [orjson.loads(line) for line in fh]
+
+
+def _today_log(log_dir: Path) -> Path:
+    """Path of the current UTC day's request log."""
+    return log_dir / time.strftime("requests_%Y-%m-%d.jsonl", time.gmtime())
+
+
+class TestSIEMForwarder:
+    """Tests for SIEMForwarder writing, rotation and failure handling."""
+
+    def test_forwarded_entries_are_written_on_close(self, tmp_path: Path) -> None:
+        """Queued entries should be written to today's file before the writer exits."""
+        forwarder = SIEMForwarder(str(tmp_path))
+        forwarder.forward({"request_id": "a"})
+        forwarder.forward({"request_id": "b"})
+        forwarder.close()
+
+        assert _read_entries(_today_log(tmp_path)) == [{"request_id": "a"}, {"request_id": "b"}]
+
+    def test_old_days_are_gzipped_at_startup(self, tmp_path: Path) -> None:
+        """A previous day's plain log should be archived when the writer starts."""
+        old = tmp_path / "requests_2020-01-01.jsonl"
+        old.write_bytes(b'{"request_id":"old"}\n')
+
+        forwarder = SIEMForwarder(str(tmp_path))
+        forwarder.close()
+
+        assert not old.exists()
+        assert _read_entries(tmp_path / "requests_2020-01-01.jsonl.gz") == [{"request_id": "old"}]
+
+    def test_day_rotation_gzips_closed_file(self, tmp_path: Path) -> None:
+        """Writing on a new day should archive the file for the day just closed."""
+        forwarder = SIEMForwarder(str(tmp_path))
+        forwarder.close()
+        previous = tmp_path / "requests_2020-01-01.jsonl"
+        forwarder._day = "2020-01-01"
+        forwarder._fh = open(previous, "ab")
+        forwarder._fh.write(b'{"request_id":"old"}\n')
+
+        forwarder._write([{"request_id": "new"}])
+        forwarder._close_handle()
+
+        assert not previous.exists()
+        assert _read_entries(tmp_path / "requests_2020-01-01.jsonl.gz") == [{"request_id": "old"}]
+        assert _read_entries(_today_log(tmp_path)) == [{"request_id": "new"}]
+
+    def test_failed_write_does_not_stop_writer(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A batch that fails to write should be dropped and later batches still written."""
+        forwarder = SIEMForwarder(str(tmp_path))
+        write = forwarder._write
+        calls = 0
+
+        def flaky_write(entries: list[dict[str, Any]]) -> None:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise OSError("disk full")
+            write(entries)
+
+        monkeypatch.setattr(forwarder, "_write", flaky_write)
+        forwarder.forward({"request_id": "lost"})
+        deadline = time.monotonic() + 5
+        while forwarder.dropped_entries == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        forwarder.forward({"request_id": "kept"})
+        forwarder.close()
+
+        assert forwarder.dropped_entries == 1
+        assert _read_entries(_today_log(tmp_path)) == [{"request_id": "kept"}]
+
+    def test_entries_are_dropped_once_writer_is_gone(self, tmp_path: Path) -> None:
+        """With no writer thread, entries should be counted and not queued."""
+        forwarder = SIEMForwarder(str(tmp_path))
+        forwarder.close()
+
+        forwarder.forward({"request_id": "late"})
+
+        assert forwarder.dropped_entries == 1
+        assert forwarder._queue.empty()
@@ -0,0 +1,176 @@
+"""Unit tests for webhook signature verification."""
+
+import hashlib
+import hmac
+import json
+import time
+from typing import Callable
+
+import pytest
+
+from atlas.api.security.webhooks import (
+    WebhookHandler,
+    WebhookVerificationError,
+    _hmac_sha256,
+    verify_lemonsqueezy_signature,
+    verify_stripe_signature,
+    verify_webhook_signature,
+)
+
+SECRET = "whsec_test"
+PAYLOAD = json.dumps({"type": "invoice.paid", "data": {"id": "in_123"}}).encode()
+
+
+def _sign(message: bytes, secret: str = SECRET) -> str:
+    """Reference HMAC-SHA256 hex signature."""
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def _stripe_header(payload: bytes = PAYLOAD, timestamp: int | None = None) -> str:
+    """Build a Stripe-Signature header for a payload."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    return f"t={timestamp},v1={_sign(f'{timestamp}.'.encode() + payload)}"
+
+
+class TestHmacSha256:
+    """Tests for the hashlib-based HMAC implementation."""
+
+    @pytest.mark.parametrize("secret", [b"", b"k", b"x" * 64, b"y" * 65, "whsec_\u00e9"])
+    def test_matches_stdlib_hmac(self, secret: bytes | str) -> None:
+        """Digests should be byte-identical to hmac.new for any key length."""
+        key = secret.encode() if isinstance(secret, str) else secret
+        expected = hmac.new(key, b"123." + PAYLOAD, hashlib.sha256).digest()
+        assert _hmac_sha256(secret, b"123.", PAYLOAD) == expected
+        # Cached states must not be consumed by a previous call
+        assert _hmac_sha256(secret, b"123." + PAYLOAD) == expected
+
+
+class TestStripeSignature:
+    """Tests for Stripe webhook verification."""
+
+    def test_valid_signature_returns_payload(self) -> None:
+        """A correctly signed, fresh event should be parsed and returned."""
+        event = verify_stripe_signature(PAYLOAD, _stripe_header(), SECRET)
+        assert event == json.loads(PAYLOAD)
+
+    def test_tampered_payload_is_rejected(self) -> None:
+        """Changing the body after signing should fail verification."""
+        with pytest.raises(WebhookVerificationError, match="signature"):
+            verify_stripe_signature(PAYLOAD + b" ", _stripe_header(), SECRET)
+
+    def test_any_matching_v1_is_accepted(self) -> None:
+        """During secret rotation, a match on any v1 signature should pass."""
+        timestamp = int(time.time())
+        old = _sign(f"{timestamp}.".encode() + PAYLOAD, secret="whsec_old")
+        header = f"t={timestamp},v1={old},{_stripe_header(timestamp=timestamp).split(',')[1]}"
+
+        assert verify_stripe_signature(PAYLOAD, header, SECRET) == json.loads(PAYLOAD)
+
+    def test_no_matching_v1_is_rejected(self) -> None:
+        """Several v1 signatures that all fail should still be rejected."""
+        timestamp = int(time.time())
+        message = f"{timestamp}.".encode() + PAYLOAD
+        header = f"t={timestamp},v1={_sign(message, 'whsec_a')},v1={_sign(message, 'whsec_b')}"
+        with pytest.raises(WebhookVerificationError, match="signature"):
+            verify_stripe_signature(PAYLOAD, header, SECRET)
+
+    def test_stale_timestamp_is_rejected(self) -> None:
+        """Events signed outside the tolerance window should be rejected."""
+        header = _stripe_header(timestamp=int(time.time()) - 3600)
+        with pytest.raises(WebhookVerificationError, match="tolerance"):
+            verify_stripe_signature(PAYLOAD, header, SECRET)
+
+    def test_oversized_header_is_rejected(self) -> None:
+        """Huge headers should be refused before they are parsed."""
+        header = _stripe_header() + ",x=" * 5000
+        with pytest.raises(WebhookVerificationError, match="too large"):
+            verify_stripe_signature(PAYLOAD, header, SECRET)
+
+    def test_invalid_json_is_rejected(self) -> None:
+        """A correctly signed body that is not JSON should raise a verification error."""
+        body = b"{not json"
+        with pytest.raises(WebhookVerificationError, match="Invalid JSON"):
+            verify_stripe_signature(body, _stripe_header(body), SECRET)
+
+    def test_malformed_header_is_rejected(self) -> None:
+        """A header without t= and v1= fields should be rejected."""
+        with pytest.raises(WebhookVerificationError, match="format"):
+            verify_stripe_signature(PAYLOAD, "garbage", SECRET)
+
+
+class TestOtherProviders:
+    """Tests for LemonSqueezy and generic verification."""
+
+    def test_lemonsqueezy_valid_signature(self) -> None:
+        """A hex HMAC of the body should verify."""
+        event = verify_lemonsqueezy_signature(PAYLOAD, _sign(PAYLOAD), SECRET)
+        assert event["type"] == "invoice.paid"
+
+    def test_lemonsqueezy_wrong_secret_is_rejected(self) -> None:
+        """A signature made with another secret should fail."""
+        with pytest.raises(WebhookVerificationError):
+            verify_lemonsqueezy_signature(PAYLOAD, _sign(PAYLOAD, "other"), SECRET)
+
+    def test_non_hex_signature_is_rejected(self) -> None:
+        """A signature that is not valid hex should fail cleanly."""
+        with pytest.raises(WebhookVerificationError, match="Invalid webhook signature"):
+            verify_webhook_signature(PAYLOAD, "not-hex!", SECRET)
+
+    @pytest.mark.parametrize(
+        "variant",
+        [str.upper, lambda sig: f" {sig}", lambda sig: f"{sig[:32]} {sig[32:]}", lambda sig: "é"],
+    )
+    def test_non_canonical_hex_is_rejected(self, variant: Callable[[str], str]) -> None:
+        """Only the exact lowercase hex digest should verify."""
+        with pytest.raises(WebhookVerificationError, match="Invalid webhook signature"):
+            verify_webhook_signature(PAYLOAD, variant(_sign(PAYLOAD)), SECRET)
+
+    def test_generic_signature_with_timestamp(self) -> None:
+        """Timestamped generic signatures cover "<timestamp>." plus the body."""
+        timestamp = int(time.time())
+        signature = _sign(f"{timestamp}.".encode() + PAYLOAD)
+        assert verify_webhook_signature(PAYLOAD, signature, SECRET, timestamp=timestamp)
+
+    def test_handler_verify_raw_returns_unparsed_body(self) -> None:
+        """verify_raw should hand back the verified bytes for the caller to parse."""
+        handler = WebhookHandler(lemonsqueezy_secret=SECRET)
+        assert handler.verify_raw(PAYLOAD, _sign(PAYLOAD), "lemonsqueezy") is PAYLOAD
+
+    def test_handler_dispatches_by_provider(self) -> None:
+        """WebhookHandler should route to the provider's verifier."""
+        handler = WebhookHandler(stripe_secret=SECRET, generic_secret=SECRET)
+        stripe_event = handler.verify_and_parse(PAYLOAD, _stripe_header(), "stripe")
+        generic_event = handler.verify_and_parse(PAYLOAD, _sign(PAYLOAD), "generic")
+        assert stripe_event == generic_event == json.loads(PAYLOAD)
+
+
+class TestVerificationCache:
+    """Tests for WebhookHandler's opt-in verification cache."""
+
+    def test_redelivery_skips_verification(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """An identical redelivery should be served without re-running the verifier."""
+        handler = WebhookHandler(generic_secret=SECRET, verification_cache_size=8)
+        signature = _sign(PAYLOAD)
+        first = handler.verify_and_parse(PAYLOAD, signature)
+
+        def fail(*args: object) -> None:
+            raise AssertionError("verifier should not run on a cached delivery")
+
+        monkeypatch.setitem(handler._VERIFIERS, "generic", fail)
+        second = handler.verify_and_parse(PAYLOAD, signature)
+        assert second == first and second is not first
+
+    def test_bad_signature_is_not_cached(self) -> None:
+        """Failed verifications must fail again on redelivery."""
+        handler = WebhookHandler(generic_secret=SECRET, verification_cache_size=8)
+        for _ in range(2):
+            with pytest.raises(WebhookVerificationError):
+                handler.verify_and_parse(PAYLOAD, _sign(PAYLOAD, "other"))
+        assert not handler._verified
+
+    def test_stripe_entry_expires_with_timestamp_tolerance(self) -> None:
+        """A Stripe entry should not be trusted past the event's tolerance window."""
+        handler = WebhookHandler(stripe_secret=SECRET, verification_cache_size=8)
+        timestamp = int(time.time()) - 290
+        handler.verify_and_parse(PAYLOAD, _stripe_header(timestamp=timestamp), "stripe")
+        assert list(handler._verified.values()) == [timestamp + 300]